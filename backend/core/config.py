@@ -18,11 +18,85 @@ class Settings(BaseSettings):
     AZURE_OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
     AZURE_OPENAI_CHAT_MODEL: str = "gpt-4o-mini"
     AZURE_OPENAI_API_VERSION: str = "2024-02-01"
-    
+    AZURE_OPENAI_MAX_CONNECTIONS: int = 100  # Async client connection pool
+    AZURE_OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+
+    # Embedding Cache
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 2000  # In-process LRU tier (~6 KB per entry)
+    EMBEDDING_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    EMBEDDING_CACHE_PERSISTENT: bool = True  # Also store entries in the embedding_cache table
+
+    # Embedding Handles (check-duplicate -> create reuses the embedding)
+    EMBEDDING_HANDLE_ENABLED: bool = True
+    EMBEDDING_HANDLE_MAX_ENTRIES: int = 2000  # ~12 KB per entry
+    EMBEDDING_HANDLE_TTL_SECONDS: int = 600
+
+    # Embedding Batching
+    EMBEDDING_BATCH_ENABLED: bool = True
+    EMBEDDING_BATCH_WINDOW_MS: int = 10  # How long to gather concurrent requests
+    EMBEDDING_BATCH_MAX_SIZE: int = 64  # Maximum texts per API call
+
+    # Similarity Search
+    # "pgvector" queries the database; "memory" uses an exact in-process index;
+    # "shared" uses an exact index in a memory-mapped file shared by all workers (POSIX only)
+    # (both scan every row per query, ~600 MB per 100k suggestions: use pgvector above ~100k)
+    VECTOR_SEARCH_BACKEND: str = "pgvector"
+    VECTOR_SHARED_STORE_PATH: str = "data/suggestion_vectors.bin"
+    VECTOR_INDEX_SYNC_SECONDS: int = 30  # How often to pick up rows added by other workers
+    VECTOR_INDEX_RECONCILE_SECONDS: int = 300  # How often to fully reconcile (late commits, deletes)
+    # pgvector candidate search: "full" (float32); "halfvec" / "binary" quantized
+    # indexes or "matryoshka" (256-d embedding_short), each with exact
+    # re-ranking (run scripts/quantize_embeddings.py <mode> first)
+    VECTOR_CANDIDATE_MODE: str = "full"
+    VECTOR_RERANK_CANDIDATES: int = 50  # Candidates re-ranked at full precision
+    # Per-query ANN search effort: "fast" profile for check-similarity while
+    # typing, "recall" profile for duplicate checks
+    VECTOR_PROBES_FAST: int = 4  # ivfflat.probes
+    VECTOR_PROBES_RECALL: int = 20
+    VECTOR_EF_SEARCH_FAST: int = 40  # hnsw.ef_search
+    VECTOR_EF_SEARCH_RECALL: int = 200
+    # pgvector >= 0.8 iterative index scans: "off", "relaxed_order" or "strict_order"
+    VECTOR_ITERATIVE_SCAN: str = "off"
+
+    # Title Autocomplete
+    # check-similarity queries up to this length are matched lexically on
+    # titles (no embedding call); longer queries use semantic search
+    LEXICAL_AUTOCOMPLETE_ENABLED: bool = True
+    LEXICAL_AUTOCOMPLETE_MAX_LENGTH: int = 12
+    LEXICAL_AUTOCOMPLETE_MIN_SCORE: float = 0.5
+
+    # Voting
+    # Buffer vote_count changes in memory and flush them in batched UPDATEs.
+    # Buffers are per worker: other workers show a vote once it is flushed.
+    # Deltas of a killed worker are lost until the periodic reconcile
+    # repairs vote_count from the votes table.
+    VOTE_WRITE_BEHIND_ENABLED: bool = False
+    VOTE_FLUSH_INTERVAL_MS: int = 250
+    VOTE_RECONCILE_SECONDS: float = 300.0  # A drift is repaired once seen twice in a row
+
+    # Feed Cache
+    FEED_CACHE_ENABLED: bool = True
+    FEED_CACHE_SIZE: int = 500  # Top-ranked cards kept per worker
+    FEED_CACHE_TTL_SECONDS: float = 5.0  # Bounds staleness from other workers' writes
+
+    # Bulk Import
+    BULK_IMPORT_BATCH_SIZE: int = 500  # Rows per embeddings call and INSERT batch
+    BULK_IMPORT_MAX_ROWS: int = 100000
+
+    # Principal Cache
+    # Authenticated users are cached by id so most requests skip the users table
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0  # Bounds how long a role change takes to apply
+
     # JWT Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14  # Rotated on every /auth/refresh
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # bcrypt threads (default: CPU count)
+    PASSWORD_HASH_MAX_QUEUE: int = 256  # Waiting bcrypt jobs before answering 503
     
     # Application
     APP_NAME: str = "Ambassador Voice Platform"
@@ -1,8 +1,12 @@
 """
 Database Connection and Session Management
-Handles PostgreSQL connection using SQLAlchemy
+Handles PostgreSQL connection using SQLAlchemy (sync psycopg2 engine for
+scripts, async asyncpg engine for request handlers)
 """
-from sqlalchemy import create_engine
+from pgvector.asyncpg import register_vector
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from core.config import settings
@@ -19,6 +23,53 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_engine_args(database_url: str):
+    """
+    Convert a libpq-style DATABASE_URL into asyncpg engine arguments
+    
+    asyncpg does not understand the "sslmode" query parameter, so it is
+    moved into connect_args as "ssl" (e.g. ?sslmode=require -> ssl="require").
+    
+    Returns:
+        Tuple of (async database URL, connect_args)
+    """
+    url = make_url(database_url)
+    query = dict(url.query)
+    sslmode = query.pop("sslmode", None)
+    
+    url = url.set(drivername="postgresql+asyncpg", query=query)
+    connect_args = {"ssl": sslmode} if sslmode else {}
+    return url, connect_args
+
+
+# Create async database engine (asyncpg) for request handlers
+_async_url, _async_connect_args = _async_engine_args(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    _async_url,
+    connect_args=_async_connect_args,
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20
+)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def _register_vector_codec(dbapi_connection, connection_record):
+    """Bind and read pgvector values in binary form on every new asyncpg connection"""
+    dbapi_connection.run_async(register_vector)
+
+
+# Create async session factory
+# expire_on_commit=False keeps loaded attributes usable after commit without
+# an implicit (and, under asyncio, forbidden) lazy reload
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for ORM models
 Base = declarative_base()
 
@@ -41,3 +92,20 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency function to get an async database session
+    
+    Yields:
+        AsyncSession that automatically closes after use
+        
+    Usage:
+        @app.get("/users")
+        async def get_users(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(User))
+            return result.scalars().all()
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -2,13 +2,13 @@
 Database Models
 SQLAlchemy ORM models for users, suggestions, and votes
 """
-from sqlalchemy import Column, String, Integer, Text, ForeignKey, DateTime, TIMESTAMP
+from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, DateTime, TIMESTAMP, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.orm import deferred, relationship
 import uuid
 from database.connection import Base
+from database.types import Vector
 
 
 class User(Base):
@@ -36,6 +36,10 @@ class Suggestion(Base):
     title = Column(String(200), nullable=False)
     description = Column(Text)
     embedding = Column(Vector(1536))  # OpenAI embedding vector
+    # Matryoshka prefix of embedding, for candidate search. Only written in
+    # matryoshka mode, so schemas without it still work: deferred keeps it
+    # out of SELECTs, evaluates_none() out of INSERTs that leave it unset
+    embedding_short = deferred(Column(Vector(256).evaluates_none()))
     vote_count = Column(Integer, default=0, index=True)  # Indexed for fast sorting
     status = Column(String(50), default="pending")  # 'pending', 'approved', 'rejected'
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
@@ -43,6 +47,11 @@ class Suggestion(Base):
     # Relationships
     user = relationship("User", back_populates="suggestions")
     votes = relationship("Vote", back_populates="suggestion")
+    
+    __table_args__ = (
+        # Matches the feed ordering so keyset pages are index range scans
+        Index("idx_suggestions_feed", vote_count.desc(), created_at, id),
+    )
 
 
 class Vote(Base):
@@ -56,3 +65,52 @@ class Vote(Base):
     # Relationships
     user = relationship("User", back_populates="votes")
     suggestion = relationship("Suggestion", back_populates="votes")
+
+
+class EmbeddingCacheEntry(Base):
+    """Persistent tier of the embedding cache, keyed by a hash of (model, API version, text)"""
+    __tablename__ = "embedding_cache"
+
+    key = Column(String(64), primary_key=True)  # SHA-256 hex digest
+    model = Column(String(100), nullable=False)
+    embedding = Column(Vector(1536), nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), index=True)
+
+
+class RefreshToken(Base):
+    """Rotating refresh token, stored as a SHA-256 hash of the token value"""
+    __tablename__ = "refresh_tokens"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False)  # SHA-256 hex digest
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)  # Shared by all rotations of one login
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    revoked_at = Column(TIMESTAMP(timezone=True))
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+
+class DuplicateCluster(Base):
+    """Group of near-duplicate suggestions found by scripts/cluster_duplicates.py, for manager review"""
+    __tablename__ = "duplicate_clusters"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    run_id = Column(UUID(as_uuid=True), nullable=False, index=True)  # Clustering job that found it
+    threshold = Column(Float, nullable=False)  # Similarity threshold of that job
+    size = Column(Integer, nullable=False)
+    max_similarity = Column(Float, nullable=False)
+    status = Column(String(50), default="pending", index=True)  # 'pending', 'confirmed', 'dismissed'
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    members = relationship("DuplicateClusterMember", back_populates="cluster", cascade="all, delete-orphan")
+
+
+class DuplicateClusterMember(Base):
+    """Suggestion in a duplicate cluster"""
+    __tablename__ = "duplicate_cluster_members"
+
+    cluster_id = Column(UUID(as_uuid=True), ForeignKey("duplicate_clusters.id", ondelete="CASCADE"), primary_key=True)
+    suggestion_id = Column(UUID(as_uuid=True), ForeignKey("suggestions.id", ondelete="CASCADE"), primary_key=True, index=True)
+    similarity = Column(Float, nullable=False)  # Highest similarity to another member
+
+    cluster = relationship("DuplicateCluster", back_populates="members")
@@ -0,0 +1,71 @@
+"""
+Raw SQL Statements
+Hand-written queries for hot paths that the ORM would split into several round trips
+"""
+from sqlalchemy import text
+
+
+# Toggle a user's vote in one statement:
+# - delete the vote if it exists, otherwise insert it
+# - adjust suggestions.vote_count by the same delta in the same statement
+# The UPDATE takes the suggestion's row lock, so concurrent toggles on one
+# suggestion serialize on it and the counter cannot drift from the votes
+# table. Returns vote_count = NULL when the suggestion does not exist.
+TOGGLE_VOTE = text("""
+    WITH target AS (
+        SELECT id FROM suggestions WHERE id = CAST(:suggestion_id AS uuid)
+    ),
+    removed AS (
+        DELETE FROM votes
+        WHERE user_id = CAST(:user_id AS uuid)
+          AND suggestion_id = CAST(:suggestion_id AS uuid)
+        RETURNING suggestion_id
+    ),
+    added AS (
+        INSERT INTO votes (user_id, suggestion_id)
+        SELECT CAST(:user_id AS uuid), id FROM target
+        WHERE NOT EXISTS (SELECT 1 FROM removed)
+        ON CONFLICT DO NOTHING
+        RETURNING suggestion_id
+    ),
+    updated AS (
+        UPDATE suggestions
+        SET vote_count = COALESCE(vote_count, 0)
+            + (SELECT count(*) FROM added)
+            - (SELECT count(*) FROM removed)
+        WHERE id = CAST(:suggestion_id AS uuid)
+        RETURNING vote_count
+    )
+    SELECT
+        (SELECT vote_count FROM updated) AS vote_count,
+        EXISTS (SELECT 1 FROM added) AS user_has_voted
+""")
+
+
+# Write-behind variant of TOGGLE_VOTE: only the votes row is written here;
+# the returned delta (+1 / -1 / 0) is buffered and applied to vote_count
+# later by utils.vote_buffer. vote_count is the currently stored value.
+TOGGLE_VOTE_DEFERRED_COUNT = text("""
+    WITH target AS (
+        SELECT id, COALESCE(vote_count, 0) AS vote_count
+        FROM suggestions
+        WHERE id = CAST(:suggestion_id AS uuid)
+    ),
+    removed AS (
+        DELETE FROM votes
+        WHERE user_id = CAST(:user_id AS uuid)
+          AND suggestion_id = CAST(:suggestion_id AS uuid)
+        RETURNING suggestion_id
+    ),
+    added AS (
+        INSERT INTO votes (user_id, suggestion_id)
+        SELECT CAST(:user_id AS uuid), id FROM target
+        WHERE NOT EXISTS (SELECT 1 FROM removed)
+        ON CONFLICT DO NOTHING
+        RETURNING suggestion_id
+    )
+    SELECT
+        (SELECT vote_count FROM target) AS vote_count,
+        (SELECT count(*) FROM added) - (SELECT count(*) FROM removed) AS delta,
+        EXISTS (SELECT 1 FROM added) AS user_has_voted
+""")
@@ -0,0 +1,33 @@
+"""
+Column Types
+pgvector column type that binds embeddings in binary form on asyncpg
+"""
+import numpy as np
+from pgvector.sqlalchemy import Vector as _Vector
+
+
+class Vector(_Vector):
+    """
+    pgvector's Vector type with native array binding for asyncpg
+
+    The async engine registers pgvector's binary codec on every asyncpg
+    connection (see database.connection), so embeddings travel as packed
+    float32 arrays instead of ~30 KB decimal strings that PostgreSQL has to
+    parse. psycopg2 (scripts, sync sessions) keeps the text format.
+    """
+    cache_ok = True
+
+    def bind_processor(self, dialect):
+        if dialect.driver != "asyncpg":
+            return super().bind_processor(dialect)
+
+        def process(value):
+            if value is None:
+                return None
+            value = np.asarray(value, dtype=np.float32)
+            if value.ndim != 1:
+                raise ValueError("expected ndim to be 1")
+            if self.dim is not None and value.shape[0] != self.dim:
+                raise ValueError("expected %d dimensions, not %d" % (self.dim, value.shape[0]))
+            return value
+        return process
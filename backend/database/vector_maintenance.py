@@ -0,0 +1,209 @@
+"""
+Vector Index Maintenance
+Tracks the suggestions embedding index against the data it was built on,
+measures its recall and rebuilds it (ivfflat with lists ~ sqrt(rows), or
+HNSW) without blocking writes
+
+Used by scripts/manage_vector_index.py, with the sync engine.
+"""
+import json
+import math
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func, select, text
+
+from database.models import Suggestion
+
+
+INDEX_NAME = "idx_suggestions_embedding"
+
+# Rebuild when the row count drifts this far from what the index was built on
+ROW_DRIFT_FACTOR = 2.0
+
+# Rebuild when measured recall@k falls below this
+RECALL_TARGET = 0.95
+
+
+def recommended_lists(rows: int) -> int:
+    """ivfflat list count for a table size (sqrt(rows), at least 1)"""
+    return max(1, round(math.sqrt(rows)))
+
+
+def index_status(conn) -> dict:
+    """
+    Describe the embedding index and how far the table has moved since it was built
+
+    Returns:
+        Dictionary with the index method, build parameters, the row count at
+        build time (from the index comment written by rebuild_index), the
+        current row count, the recommended lists and the row drift ratio
+    """
+    row = conn.execute(text("""
+        SELECT am.amname, c.reloptions, obj_description(c.oid, 'pg_class')
+        FROM pg_class c
+        JOIN pg_am am ON am.oid = c.relam
+        WHERE c.relname = :name AND c.relkind = 'i'
+    """), {"name": INDEX_NAME}).first()
+
+    rows = conn.execute(
+        select(func.count()).select_from(Suggestion).where(Suggestion.embedding.is_not(None))
+    ).scalar()
+
+    if row is None:
+        return {"exists": False, "rows": rows, "recommended_lists": recommended_lists(rows)}
+
+    method, reloptions, comment = row
+    options = dict(option.split("=", 1) for option in (reloptions or []))
+    build = _parse_comment(comment)
+    built_rows = build.get("rows")
+
+    return {
+        "exists": True,
+        "method": method,
+        "options": options,
+        "built_at": build.get("built_at"),
+        "built_rows": built_rows,
+        "rows": rows,
+        "recommended_lists": recommended_lists(rows),
+        # None when the index predates build tracking (e.g. database_setup.sql)
+        "row_drift": (max(rows, 1) / max(built_rows, 1)) if built_rows is not None else None
+    }
+
+
+def needs_rebuild(status: dict, recall: Optional[float] = None) -> Optional[str]:
+    """
+    Decide whether the index should be rebuilt
+
+    Returns:
+        The reason, or None if the index is fine
+    """
+    if not status["exists"]:
+        return "index is missing"
+    if recall is not None and recall < RECALL_TARGET:
+        return f"recall {recall:.3f} is below {RECALL_TARGET}"
+    if status["method"] != "ivfflat":
+        return None
+
+    drift = status["row_drift"]
+    if drift is None:
+        # Untracked build: infer the drift from how far lists is from sqrt(rows)
+        lists = max(int(status["options"].get("lists", 1)), 1)
+        drift = (lists / status["recommended_lists"]) ** 2
+        reason = f"lists = {lists} does not fit {status['rows']} rows (recommended {status['recommended_lists']})"
+    else:
+        reason = f"row count drifted {max(drift, 1 / drift):.1f}x since the build"
+    if max(drift, 1 / drift) >= ROW_DRIFT_FACTOR:
+        return reason
+    return None
+
+
+def rebuild_index(
+    engine,
+    method: str = "ivfflat",
+    lists: Optional[int] = None,
+    m: int = 16,
+    ef_construction: int = 64
+) -> dict:
+    """
+    Build a new embedding index CONCURRENTLY and swap it in
+
+    Queries keep using the old index until the new one is ready; writes are
+    never blocked. The build parameters and row count are stored in the
+    index comment so index_status() can track drift later.
+
+    Args:
+        engine: Sync SQLAlchemy engine (CONCURRENTLY cannot run in a transaction)
+        method: "ivfflat" or "hnsw"
+        lists: ivfflat lists (default: recommended_lists(rows))
+        m, ef_construction: HNSW build parameters
+
+    Returns:
+        The build record written to the index comment
+    """
+    new_name = f"{INDEX_NAME}_new"
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        rows = conn.execute(
+            select(func.count()).select_from(Suggestion).where(Suggestion.embedding.is_not(None))
+        ).scalar()
+
+        if method == "ivfflat":
+            lists = lists or recommended_lists(rows)
+            with_clause = f"lists = {int(lists)}"
+            build = {"method": method, "lists": lists}
+        elif method == "hnsw":
+            with_clause = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+            build = {"method": method, "m": m, "ef_construction": ef_construction}
+        else:
+            raise ValueError(f"Unknown index method {method!r}")
+
+        # Leftover from an interrupted rebuild
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {new_name}"))
+        conn.execute(text(
+            f"CREATE INDEX CONCURRENTLY {new_name} ON suggestions "
+            f"USING {method} (embedding vector_cosine_ops) WITH ({with_clause})"
+        ))
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}"))
+        conn.execute(text(f"ALTER INDEX {new_name} RENAME TO {INDEX_NAME}"))
+
+        build.update(rows=rows, built_at=datetime.now(timezone.utc).isoformat())
+        conn.execute(text(f"COMMENT ON INDEX {INDEX_NAME} IS {_quote(json.dumps(build))}"))
+    return build
+
+
+def measure_recall(conn, mode: str = "full", sample: int = 100, k: int = 5, profile: str = "recall") -> Optional[float]:
+    """
+    Mean recall@k of an indexed similarity query against exact search
+
+    Stored embeddings are used as queries. Exact top-k results are computed
+    with index scans disabled, so they do not depend on any ANN index.
+
+    Args:
+        conn: Sync connection
+        mode: VECTOR_CANDIDATE_MODE whose query is measured
+        sample: Number of query embeddings
+        k: Results compared per query
+        profile: Search profile ("fast" or "recall") for probes / ef_search
+
+    Returns:
+        Mean recall@k, or None if there are no embeddings
+    """
+    from utils.ai import SIMILARITY_QUERIES, _search_setup, _similarity_params
+
+    embeddings = conn.execute(
+        select(Suggestion.embedding)
+        .where(Suggestion.embedding.is_not(None))
+        .order_by(func.random())
+        .limit(sample)
+    ).scalars().all()
+    if not embeddings:
+        return None
+
+    recalls = []
+    for embedding in embeddings:
+        params = _similarity_params(list(embedding), threshold=-1.0, limit=k, mode=mode)
+
+        conn.execute(text("SET LOCAL enable_indexscan = off"))
+        exact = {row[0] for row in conn.execute(SIMILARITY_QUERIES["full"], params)}
+        conn.rollback()
+
+        for statement, search_params in _search_setup(profile, k, mode):
+            conn.execute(statement, search_params)
+        approximate = {row[0] for row in conn.execute(SIMILARITY_QUERIES[mode], params)}
+        conn.rollback()
+
+        recalls.append(len(exact & approximate) / len(exact) if exact else 1.0)
+
+    return sum(recalls) / len(recalls)
+
+
+def _parse_comment(comment: Optional[str]) -> dict:
+    try:
+        return json.loads(comment) if comment else {}
+    except ValueError:
+        return {}
+
+
+def _quote(value: str) -> str:
+    # COMMENT ON does not accept bind parameters
+    return "'" + value.replace("'", "''") + "'"
@@ -2,10 +2,26 @@
 Vote.ai - Ambassador Voice Platform
 Main FastAPI Application Entry Point
 """
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import settings
-from routers import auth, suggestions
+from database.connection import AsyncSessionLocal, async_engine
+from routers import admin, auth, suggestions
+from utils.ai import async_client, async_embedding_batcher, get_vector_index
+from utils.autocomplete import title_index
+from utils.embedding_cache import embedding_cache
+from utils.embedding_handles import embedding_handles
+from utils.feed_cache import feed_cache
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.password_pool import password_pool
+from utils.principal_cache import principal_cache
+from utils.shared_vectors import shared_vector_store
+from utils.vector_index import sync_index_forever, vector_index
+from utils.vote_buffer import (
+    flush_vote_counts, flush_vote_counts_forever, reconcile_vote_counts_forever, vote_counter_buffer
+)
 
 
 # Initialize FastAPI app
@@ -30,12 +46,67 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # Keyset pagination cursor
 )
 
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(suggestions.router)
+app.include_router(admin.router)
+
+
+# Background tasks started at startup (kept referenced until shutdown)
+background_tasks = set()
+
+
+@app.on_event("startup")
+async def startup():
+    """
+    Warm in-process indexes and start background tasks
+    """
+    if settings.VECTOR_SEARCH_BACKEND in ("memory", "shared"):
+        async with AsyncSessionLocal() as db:
+            if settings.VECTOR_SEARCH_BACKEND == "memory":
+                await vector_index.aload(db)
+            else:
+                await shared_vector_store.aopen(db)
+        background_tasks.add(asyncio.create_task(
+            sync_index_forever(
+                get_vector_index(), settings.VECTOR_INDEX_SYNC_SECONDS, settings.VECTOR_INDEX_RECONCILE_SECONDS
+            )
+        ))
+    
+    if settings.LEXICAL_AUTOCOMPLETE_ENABLED:
+        async with AsyncSessionLocal() as db:
+            await title_index.aload(db)
+        background_tasks.add(asyncio.create_task(
+            sync_index_forever(
+                title_index, settings.VECTOR_INDEX_SYNC_SECONDS, settings.VECTOR_INDEX_RECONCILE_SECONDS
+            )
+        ))
+    
+    if settings.VOTE_WRITE_BEHIND_ENABLED:
+        background_tasks.add(asyncio.create_task(
+            flush_vote_counts_forever(settings.VOTE_FLUSH_INTERVAL_MS)
+        ))
+        background_tasks.add(asyncio.create_task(
+            reconcile_vote_counts_forever(settings.VOTE_RECONCILE_SECONDS)
+        ))
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Release pooled connections on shutdown
+    """
+    for task in background_tasks:
+        task.cancel()
+    # Do not lose buffered vote counts
+    await flush_vote_counts()
+    await async_client.close()
+    await async_engine.dispose()
+    password_pool.shutdown()
 
 
 # Root endpoint
@@ -65,6 +136,26 @@ async def health_check():
     return {"status": "healthy"}
 
 
+# Runtime metrics endpoint
+@app.get("/metrics")
+async def metrics():
+    """
+    Cache and pool counters for monitoring
+    """
+    return {
+        "embedding_cache": embedding_cache.stats(),
+        "embedding_handles": embedding_handles.stats(),
+        "async_embedding_batcher": async_embedding_batcher.stats(),
+        "vector_index": vector_index.stats(),
+        "shared_vector_store": shared_vector_store.stats(),
+        "title_index": {"loaded": title_index.loaded, "titles": len(title_index)},
+        "vote_counter_buffer": vote_counter_buffer.stats(),
+        "feed_cache": feed_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "password_pool": password_pool.stats()
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     
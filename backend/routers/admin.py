@@ -0,0 +1,325 @@
+"""
+Admin Router
+Manager-only bulk operations: suggestion import, data exports and review
+of the near-duplicate clusters found by scripts/cluster_duplicates.py
+"""
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import uuid
+
+from core.config import settings
+from database.connection import get_async_db
+from database.models import DuplicateCluster, DuplicateClusterMember, Suggestion
+from routers.auth import require_manager
+from utils.ai import aget_embeddings, afind_similar_suggestions, get_vector_index, short_embedding_values
+from utils.autocomplete import title_index
+from utils.bulk_import import IMPORT_FORMATS, ImportFileError, achunked, detect_format, iter_import_rows
+from utils.embedding_cache import normalize_text
+from utils.export import EXPORT_COLUMNS, EXPORT_FORMATS, export_query, stream_export
+from utils.feed_cache import feed_cache
+from utils.principal_cache import Principal
+from utils.vector_index import VectorIndex
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+DUPLICATE_CLUSTER_STATUSES = ("pending", "confirmed", "dismissed")
+
+
+class DuplicateClusterUpdate(BaseModel):
+    status: str
+
+
+@router.post("/suggestions/import")
+async def import_suggestions(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    dedupe: bool = False,
+    dedupe_threshold: float = 0.85,
+    db: AsyncSession = Depends(get_async_db),
+    manager: Principal = Depends(require_manager)
+):
+    """
+    Bulk-import suggestions from a CSV or JSONL upload (managers only)
+
+    - Each row needs a title and may have a description
+    - Rows are embedded in large batched API calls and inserted in
+      batches, all in a single transaction
+    - The upload is parsed in a worker thread; a CSV file that is not
+      UTF-8 or is malformed is rejected with 400
+    - dedupe=true skips rows similar to an existing suggestion or to an
+      earlier row of the same file at dedupe_threshold or above
+
+    Returns one result per row, in row order: created, duplicate or invalid
+    """
+    fmt = format or detect_format(file.filename, file.content_type)
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown import format, pass ?format=csv or ?format=jsonl"
+        )
+
+    results = []
+    imported = []  # (id, title, embedding) of inserted rows
+    first_row_for_text = {}  # Normalized text -> id given to its first row
+    skipped_ids = {}  # Id given to a row -> existing suggestion it duplicated
+    accepted = VectorIndex()  # Embeddings of the rows created so far, for in-file dedupe
+
+    async for chunk in _import_chunks(file, fmt):
+        pending = []
+        for row_number, fields, error in chunk:
+            if len(results) >= settings.BULK_IMPORT_MAX_ROWS:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Imports are limited to {settings.BULK_IMPORT_MAX_ROWS} rows"
+                )
+            if error is not None:
+                results.append({"row": row_number, "status": "invalid", "error": error})
+                continue
+
+            combined_text = normalize_text(f"{fields['title']} {fields['description'] or ''}")
+            if dedupe and combined_text.casefold() in first_row_for_text:
+                results.append({
+                    "row": row_number,
+                    "status": "duplicate",
+                    "duplicate_of": first_row_for_text[combined_text.casefold()],
+                    "similarity": 1.0
+                })
+                continue
+
+            suggestion_id = uuid.uuid4()
+            first_row_for_text[combined_text.casefold()] = str(suggestion_id)
+            pending.append((row_number, suggestion_id, fields, combined_text))
+
+        if not pending:
+            continue
+
+        # One embeddings call per chunk instead of one per suggestion
+        embeddings = await aget_embeddings([text for _, _, _, text in pending])
+
+        values = []
+        for (row_number, suggestion_id, fields, _), embedding in zip(pending, embeddings):
+            if dedupe:
+                # Earlier rows of this file (not yet inserted, or not visible
+                # to the memory / shared backends), then existing suggestions
+                similar = [
+                    {"id": match_id, "similarity": similarity}
+                    for match_id, similarity in await accepted.asearch(embedding, dedupe_threshold, 1)
+                ]
+                if not similar:
+                    similar = await afind_similar_suggestions(db, embedding, threshold=dedupe_threshold, limit=1)
+                if similar:
+                    skipped_ids[str(suggestion_id)] = similar[0]["id"]
+                    results.append({
+                        "row": row_number,
+                        "status": "duplicate",
+                        "duplicate_of": similar[0]["id"],
+                        "similarity": similar[0]["similarity"]
+                    })
+                    continue
+                accepted.add(suggestion_id, embedding)
+
+            values.append({
+                "id": suggestion_id,
+                "user_id": manager.id,
+                "title": fields["title"],
+                "description": fields["description"],
+                "embedding": embedding,
+                "vote_count": 0,
+                "status": "pending",
+                **short_embedding_values(embedding)
+            })
+            imported.append((suggestion_id, fields["title"], embedding))
+            results.append({"row": row_number, "status": "created", "id": str(suggestion_id)})
+
+        if values:
+            # Without RETURNING this is the driver's executemany: asyncpg
+            # prepares the INSERT once and pipelines one execution per row
+            await db.execute(insert(Suggestion), values)
+
+    await db.commit()
+
+    # Rows that repeated a skipped row point at the suggestion it duplicated
+    for result in results:
+        if result.get("duplicate_of") in skipped_ids:
+            result["duplicate_of"] = skipped_ids[result["duplicate_of"]]
+    # Invalid and exact-text duplicate rows are reported before the rest of their chunk
+    results.sort(key=lambda result: result["row"])
+
+    # Make the new rows searchable and visible without waiting for a sync
+    index = get_vector_index()
+    if index is not None:
+        await index.aadd_many((suggestion_id, embedding) for suggestion_id, _, embedding in imported)
+    if title_index.loaded:
+        for suggestion_id, title, _ in imported:
+            title_index.add(suggestion_id, title)
+    if imported:
+        feed_cache.invalidate()
+
+    return ORJSONResponse({
+        "created": sum(1 for result in results if result["status"] == "created"),
+        "duplicates": sum(1 for result in results if result["status"] == "duplicate"),
+        "invalid": sum(1 for result in results if result["status"] == "invalid"),
+        "results": results
+    })
+
+
+async def _import_chunks(file: UploadFile, fmt: str):
+    """Parsed rows of an upload in BULK_IMPORT_BATCH_SIZE chunks; unreadable files are a 400"""
+    try:
+        async for chunk in achunked(iter_import_rows(file.file, fmt), settings.BULK_IMPORT_BATCH_SIZE):
+            yield chunk
+    except ImportFileError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/export/{dataset}")
+async def export_data(
+    dataset: str,
+    format: str = "ndjson",
+    columns: Optional[str] = None,
+    manager: Principal = Depends(require_manager)
+):
+    """
+    Stream a dataset as NDJSON or CSV (managers only)
+
+    - dataset: "suggestions", "vote-counts" (stored and counted votes per
+      suggestion) or "votes" (raw votes with voted_at)
+    - columns: comma-separated subset of the dataset's columns (default: all)
+
+    Rows are read from a server-side cursor and encoded in chunks, so memory
+    use does not depend on the table size. Embeddings are never exported.
+    """
+    if dataset not in EXPORT_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown dataset, expected one of: {', '.join(EXPORT_COLUMNS)}"
+        )
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown format, expected one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    available = EXPORT_COLUMNS[dataset]
+    selected = [column.strip() for column in columns.split(",")] if columns else list(available)
+    unknown = [column for column in selected if column not in available]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown columns: {', '.join(unknown)}. Available: {', '.join(available)}"
+        )
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_export(export_query(dataset, selected), selected, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{format}"'}
+    )
+
+
+@router.get("/duplicate-clusters")
+async def list_duplicate_clusters(
+    cluster_status: str = Query("pending", alias="status"),
+    skip: int = 0,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_async_db),
+    manager: Principal = Depends(require_manager)
+):
+    """
+    List near-duplicate clusters for review (managers only)
+
+    - status: "pending" (default), "confirmed" or "dismissed"
+    - Largest and closest clusters first, each with its suggestions ordered
+      by their highest similarity to another member
+    """
+    if cluster_status not in DUPLICATE_CLUSTER_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown status, expected one of: {', '.join(DUPLICATE_CLUSTER_STATUSES)}"
+        )
+    limit = min(limit, 100)
+
+    result = await db.execute(
+        select(DuplicateCluster)
+        .where(DuplicateCluster.status == cluster_status)
+        .order_by(DuplicateCluster.size.desc(), DuplicateCluster.max_similarity.desc(), DuplicateCluster.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    clusters = result.scalars().all()
+
+    members = {cluster.id: [] for cluster in clusters}
+    if clusters:
+        # All members of the page in one query
+        result = await db.execute(
+            select(
+                DuplicateClusterMember.cluster_id,
+                DuplicateClusterMember.similarity,
+                Suggestion.id,
+                Suggestion.title,
+                Suggestion.vote_count,
+                Suggestion.status
+            )
+            .join(Suggestion, Suggestion.id == DuplicateClusterMember.suggestion_id)
+            .where(DuplicateClusterMember.cluster_id.in_(list(members)))
+            .order_by(DuplicateClusterMember.similarity.desc())
+        )
+        for row in result:
+            members[row.cluster_id].append({
+                "id": str(row.id),
+                "title": row.title,
+                "vote_count": row.vote_count,
+                "status": row.status,
+                "similarity": row.similarity
+            })
+
+    return ORJSONResponse([
+        {
+            "id": str(cluster.id),
+            "size": cluster.size,
+            "max_similarity": cluster.max_similarity,
+            "threshold": cluster.threshold,
+            "status": cluster.status,
+            "created_at": cluster.created_at,
+            "suggestions": members[cluster.id]
+        }
+        for cluster in clusters
+    ])
+
+
+@router.patch("/duplicate-clusters/{cluster_id}")
+async def update_duplicate_cluster(
+    cluster_id: uuid.UUID,
+    update: DuplicateClusterUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    manager: Principal = Depends(require_manager)
+):
+    """
+    Mark a near-duplicate cluster as confirmed or dismissed (managers only)
+
+    Reviewed clusters are kept by later clustering runs and not proposed again.
+    """
+    if update.status not in DUPLICATE_CLUSTER_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown status, expected one of: {', '.join(DUPLICATE_CLUSTER_STATUSES)}"
+        )
+
+    cluster = await db.get(DuplicateCluster, cluster_id)
+    if cluster is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Duplicate cluster not found"
+        )
+
+    cluster.status = update.status
+    await db.commit()
+    return {"id": str(cluster.id), "status": cluster.status}
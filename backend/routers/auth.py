@@ -1,18 +1,21 @@
 """
 Authentication Router
-Handles user registration and login
+Handles user registration, login and session refresh
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 import uuid
 
-from database.connection import get_db
-from database.models import User
-from utils.security import hash_password, verify_password, create_access_token, verify_token
+from database.connection import get_async_db
+from database.models import RefreshToken, User
+from utils.password_pool import PasswordPoolBusy, password_pool
+from utils.principal_cache import Principal, principal_cache
+from utils.security import create_access_token, verify_token, create_refresh_token, hash_refresh_token
 from core.config import settings
 
 
@@ -27,7 +30,7 @@ class UserRegister(BaseModel):
     email: EmailStr
     password: str
     full_name: Optional[str] = None
-    role: str = "ambassador"
+    role: Optional[str] = None  # Accepted for old clients; only "ambassador" is allowed
 
 
 class UserResponse(BaseModel):
@@ -43,19 +46,35 @@ class UserResponse(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
     email: Optional[str] = None
 
 
+def _token_user_id(payload: dict) -> Optional[uuid.UUID]:
+    """The user_id claim of a token, or None if absent or malformed"""
+    try:
+        return uuid.UUID(payload["user_id"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
 # Dependency to get current user from token
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
     """
     Verify JWT token and return the current user
+    
+    - Fast path: the principal cache, keyed by the token's user_id claim
+    - Slow path: load the user from the database and cache it
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -71,24 +90,128 @@ async def get_current_user(
     if email is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    user_id = _token_user_id(payload)
+    if settings.PRINCIPAL_CACHE_ENABLED and user_id is not None:
+        principal = principal_cache.get(user_id)
+        if principal is not None and principal.email == email:
+            return principal
+    
+    # Tokens issued before user_id was added are resolved by email
+    if user_id is not None:
+        result = await db.execute(select(User).where(User.id == user_id))
+    else:
+        result = await db.execute(select(User).where(User.email == email))
+    user = result.scalar_one_or_none()
+    if user is None or user.email != email:
         raise credentials_exception
     
-    return user
+    principal = Principal.from_user(user)
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        principal_cache.set(principal)
+    
+    return principal
+
+
+async def require_manager(current_user: Principal = Depends(get_current_user)) -> Principal:
+    """
+    Restrict an endpoint to managers
+    """
+    if current_user.role != "manager":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Manager role required"
+        )
+    return current_user
+
+
+def _access_token_for(user: User) -> str:
+    """Create an access token carrying the claims get_current_user relies on"""
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return create_access_token(
+        data={"sub": user.email, "user_id": str(user.id), "role": user.role},
+        expires_delta=access_token_expires
+    )
+
+
+def _issue_refresh_token(db: AsyncSession, user_id: uuid.UUID, family_id: uuid.UUID) -> str:
+    """
+    Add a new refresh token to the session (the caller commits)
+    
+    Returns:
+        The token value to hand to the client
+    """
+    token, token_hash = create_refresh_token()
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=token_hash,
+        family_id=family_id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return token
+
+
+async def _revoke_family(db: AsyncSession, family_id: uuid.UUID) -> None:
+    """Revoke every live token of one login"""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _hash_password(password: str) -> str:
+    """Hash on the bcrypt pool, answering 503 when it is saturated"""
+    try:
+        return await password_pool.hash(password)
+    except PasswordPoolBusy:
+        raise _password_pool_busy()
+
+
+async def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify on the bcrypt pool, answering 503 when it is saturated"""
+    try:
+        return await password_pool.verify(plain_password, hashed_password)
+    except PasswordPoolBusy:
+        raise _password_pool_busy()
+
+
+def _password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts in progress, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user
     
     - Checks if email already exists
-    - Hashes the password using bcrypt
+    - Hashes the password using bcrypt (on the password pool, off the event loop)
     - Saves user to database
+    - New accounts are always ambassadors; managers are promoted with
+      scripts/set_user_role.py
     """
+    if user_data.role not in (None, "ambassador"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="New accounts are ambassadors; roles are assigned by an administrator"
+        )
+    
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User.id).where(User.email == user_data.email))
+    existing_user = result.first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -100,13 +223,12 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         id=uuid.uuid4(),
         email=user_data.email,
         full_name=user_data.full_name,
-        password_hash=hash_password(user_data.password),
-        role=user_data.role
+        password_hash=await _hash_password(user_data.password),
+        role="ambassador"
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     
     return UserResponse(
         id=str(new_user.id),
@@ -119,7 +241,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Login with email and password
@@ -130,27 +252,102 @@ async def login(
     Note: OAuth2PasswordRequestForm uses 'username' field, but we treat it as email
     """
     # Find user by email (form_data.username is actually the email)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalar_one_or_none()
     
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user or not await _verify_password(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create access token
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email, "user_id": str(user.id), "role": user.role},
-        expires_delta=access_token_expires
+    # Create access token, plus a refresh token starting a new token family
+    refresh_token = _issue_refresh_token(db, user.id, family_id=uuid.uuid4())
+    await db.commit()
+    
+    return Token(
+        access_token=_access_token_for(user),
+        token_type="bearer",
+        refresh_token=refresh_token
+    )
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Exchange a refresh token for a new access token (no password check)
+    
+    - Refresh tokens are single-use: each call rotates it and returns a new one
+    - Presenting an already-rotated token revokes the whole token family,
+      since it means the token was copied
+    """
+    token_hash = hash_refresh_token(request.refresh_token)
+    
+    # Revoke the presented token in the same statement that validates it,
+    # so two concurrent refreshes with one token cannot both succeed
+    result = await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > func.now()
+        )
+        .values(revoked_at=func.now())
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+        .execution_options(synchronize_session=False)
     )
+    claimed = result.first()
+    
+    if claimed is None:
+        result = await db.execute(
+            select(RefreshToken.family_id).where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked_at.is_not(None)
+            )
+        )
+        reused_family_id = result.scalar_one_or_none()
+        if reused_family_id is not None:
+            await _revoke_family(db, reused_family_id)
+            await db.commit()
+        raise _invalid_refresh_token()
+    
+    result = await db.execute(select(User).where(User.id == claimed.user_id))
+    user = result.scalar_one_or_none()
+    if user is None:
+        raise _invalid_refresh_token()
+    
+    refresh_token = _issue_refresh_token(db, user.id, family_id=claimed.family_id)
+    await db.commit()
     
-    return Token(access_token=access_token, token_type="bearer")
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        principal_cache.set(Principal.from_user(user))
+    
+    return Token(
+        access_token=_access_token_for(user),
+        token_type="bearer",
+        refresh_token=refresh_token
+    )
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Revoke a refresh token and every token rotated from the same login
+    """
+    result = await db.execute(
+        select(RefreshToken.family_id).where(
+            RefreshToken.token_hash == hash_refresh_token(request.refresh_token)
+        )
+    )
+    family_id = result.scalar_one_or_none()
+    if family_id is not None:
+        await _revoke_family(db, family_id)
+        await db.commit()
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: Principal = Depends(get_current_user)):
     """
     Get current authenticated user information
     """
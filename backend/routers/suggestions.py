@@ -3,15 +3,27 @@ Suggestions Router
 Handles suggestion creation, listing, voting, and AI-powered duplicate detection
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from pydantic import BaseModel, Field
 from typing import List, Optional
 import uuid
 
-from database.connection import get_db
-from database.models import User, Suggestion, Vote
+from core.config import settings
+from database.connection import get_async_db
+from database.models import Suggestion, Vote
+from database.queries import TOGGLE_VOTE, TOGGLE_VOTE_DEFERRED_COUNT
 from routers.auth import get_current_user
-from utils.ai import get_embedding, find_similar_suggestions
+from utils.ai import aget_embedding, afetch_scored_suggestions, afind_similar_suggestions, get_vector_index, short_embedding_values
+from utils.autocomplete import title_index
+from utils.embedding_cache import normalize_text
+from utils.embedding_handles import HANDLE_MAX_LENGTH, HANDLE_PATTERN, embedding_handles
+from utils.feed_cache import feed_cache, suggestion_card
+from utils.pagination import NEXT_CURSOR_HEADER, after_cursor, decode_cursor, feed_order, next_cursor
+from utils.principal_cache import Principal
+from utils.vote_buffer import vote_counter_buffer
 
 
 router = APIRouter(prefix="/suggestions", tags=["Suggestions"])
@@ -21,6 +33,8 @@ router = APIRouter(prefix="/suggestions", tags=["Suggestions"])
 class SuggestionCreate(BaseModel):
     title: str
     description: Optional[str] = None
+    # From check-duplicate, for the same title and description
+    embedding_handle: Optional[str] = Field(None, max_length=HANDLE_MAX_LENGTH, pattern=HANDLE_PATTERN)
 
 
 class SuggestionResponse(BaseModel):
@@ -41,6 +55,7 @@ class DuplicateCheckResponse(BaseModel):
     duplicate_found: bool
     similar_suggestions: List[dict] = []
     message: Optional[str] = None
+    embedding_handle: Optional[str] = None  # Pass to POST /suggestions to reuse the embedding
 
 
 class VoteResponse(BaseModel):
@@ -65,8 +80,8 @@ class SimilarSuggestion(BaseModel):
 @router.post("/check-similarity", response_model=List[SimilarSuggestion])
 async def check_similarity(
     request: SimilarityCheckRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Check for similar suggestions in real-time as user types
@@ -75,83 +90,118 @@ async def check_similarity(
     instant feedback about similar ideas while the user is typing the title.
     
     Returns suggestions with similarity > 80% (0.80 threshold)
+    
+    Short queries (up to LEXICAL_AUTOCOMPLETE_MAX_LENGTH characters) are
+    matched on title trigrams instead, without calling Azure OpenAI.
     """
     # Validate input
-    if not request.query or len(request.query.strip()) < 3:
+    query = (request.query or "").strip()
+    if len(query) < 3:
         return []
     
-    # Generate embedding for the search query
-    query_embedding = get_embedding(request.query.strip())
-    
-    # Find similar suggestions (threshold = 0.55 means 55% similar)
-    # Lowered from 0.80 to 0.55 for better detection of similar ideas
-    similar = find_similar_suggestions(
-        db, 
-        query_embedding, 
-        threshold=0.55,  # 55% similarity threshold
-        limit=request.limit
-    )
-    
-    # Transform to response format
-    results = []
-    for suggestion in similar:
-        results.append(SimilarSuggestion(
-            id=suggestion["id"],
-            title=suggestion["title"],
-            description=suggestion["description"],
-            total_votes=suggestion["vote_count"],
-            similarity_score=suggestion["similarity"]
-        ))
+    if (
+        settings.LEXICAL_AUTOCOMPLETE_ENABLED
+        and title_index.loaded
+        and len(query) <= settings.LEXICAL_AUTOCOMPLETE_MAX_LENGTH
+    ):
+        # Lexical tier: a prefix is too short to embed meaningfully anyway
+        hits = title_index.search(
+            query,
+            limit=request.limit,
+            min_score=settings.LEXICAL_AUTOCOMPLETE_MIN_SCORE
+        )
+        similar = await afetch_scored_suggestions(db, hits)
+    else:
+        # Generate embedding for the search query
+        query_embedding = await aget_embedding(query)
+        
+        # Find similar suggestions (threshold = 0.55 means 55% similar)
+        # Lowered from 0.80 to 0.55 for better detection of similar ideas
+        similar = await afind_similar_suggestions(
+            db, 
+            query_embedding, 
+            threshold=0.55,  # 55% similarity threshold
+            limit=request.limit,
+            profile="fast"  # Runs on every keystroke: favour latency over recall
+        )
     
-    return results
+    # Transform to response format (plain dicts serialized by orjson, this
+    # endpoint runs on every keystroke)
+    return ORJSONResponse([
+        {
+            "id": suggestion["id"],
+            "title": suggestion["title"],
+            "description": suggestion["description"],
+            "total_votes": vote_counter_buffer.overlay(suggestion["id"], suggestion["vote_count"]),
+            "similarity_score": suggestion["similarity"]
+        }
+        for suggestion in similar
+    ])
 
 
 @router.post("/check-duplicate", response_model=DuplicateCheckResponse)
 async def check_duplicate(
     suggestion_data: SuggestionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Check if a similar suggestion already exists using AI
     
     This should be called BEFORE creating a new suggestion to prevent duplicates
+    
+    The response carries a short-lived embedding_handle: passing it to
+    POST /suggestions with the same title and description skips computing
+    the embedding a second time
     """
     # Generate embedding for the new suggestion
-    combined_text = f"{suggestion_data.title} {suggestion_data.description or ''}"
-    embedding = get_embedding(combined_text)
+    combined_text = normalize_text(f"{suggestion_data.title} {suggestion_data.description or ''}")
+    embedding = await aget_embedding(combined_text)
+    
+    handle = None
+    if settings.EMBEDDING_HANDLE_ENABLED:
+        handle = embedding_handles.issue(current_user.id, combined_text, embedding)
     
     # Find similar suggestions (threshold = 0.85 means 85% similar)
-    similar = find_similar_suggestions(db, embedding, threshold=0.85, limit=3)
+    similar = await afind_similar_suggestions(db, embedding, threshold=0.85, limit=3)
     
     if similar:
         return DuplicateCheckResponse(
             duplicate_found=True,
             similar_suggestions=similar,
-            message=f"مقترح مشابه موجود بالفعل مع {similar[0]['vote_count']} صوت. هل تريد التصويت عليه بدلاً من ذلك؟"
+            message=f"مقترح مشابه موجود بالفعل مع {similar[0]['vote_count']} صوت. هل تريد التصويت عليه بدلاً من ذلك؟",
+            embedding_handle=handle
         )
     
     return DuplicateCheckResponse(
         duplicate_found=False,
-        message="لا توجد مقترحات مشابهة. يمكنك المتابعة لإنشاء المقترح."
+        message="لا توجد مقترحات مشابهة. يمكنك المتابعة لإنشاء المقترح.",
+        embedding_handle=handle
     )
 
 
 @router.post("", response_model=SuggestionResponse, status_code=status.HTTP_201_CREATED)
 async def create_suggestion(
     suggestion_data: SuggestionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Create a new suggestion
     
-    - Generates AI embedding for the suggestion
+    - Generates AI embedding for the suggestion (or reuses the one behind
+      embedding_handle from check-duplicate, if the text is unchanged)
     - Saves to database with embedding vector
     """
-    # Generate embedding
-    combined_text = f"{suggestion_data.title} {suggestion_data.description or ''}"
-    embedding = get_embedding(combined_text)
+    combined_text = normalize_text(f"{suggestion_data.title} {suggestion_data.description or ''}")
+    
+    embedding = None
+    if suggestion_data.embedding_handle and settings.EMBEDDING_HANDLE_ENABLED:
+        embedding = embedding_handles.redeem(suggestion_data.embedding_handle, current_user.id, combined_text)
+    
+    # Generate embedding (no usable handle)
+    if embedding is None:
+        embedding = await aget_embedding(combined_text)
     
     # Create suggestion
     new_suggestion = Suggestion(
@@ -161,74 +211,141 @@ async def create_suggestion(
         description=suggestion_data.description,
         embedding=embedding,
         vote_count=0,
-        status="pending"
+        status="pending",
+        **short_embedding_values(embedding)
     )
     
     db.add(new_suggestion)
-    db.commit()
-    db.refresh(new_suggestion)
+    await db.commit()
+    await db.refresh(new_suggestion, ["created_at"])
     
-    return SuggestionResponse(
-        id=str(new_suggestion.id),
-        user_id=str(new_suggestion.user_id),
-        title=new_suggestion.title,
-        description=new_suggestion.description,
-        vote_count=new_suggestion.vote_count,
-        status=new_suggestion.status,
-        created_at=str(new_suggestion.created_at),
-        user_has_voted=False
+    # Keep the vector index current without waiting for the next sync
+    index = get_vector_index()
+    if index is not None:
+        await index.aadd_many([(new_suggestion.id, embedding)])
+    if title_index.loaded:
+        title_index.add(new_suggestion.id, new_suggestion.title)
+    
+    card = suggestion_card(new_suggestion)
+    feed_cache.add_suggestion(card, new_suggestion.created_at)
+    
+    return SuggestionResponse(**card, user_has_voted=False)
+
+
+def _parse_cursor(cursor: Optional[str]):
+    """Decode a cursor query parameter, rejecting malformed ones with 400"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _card_list_response(cards: List[dict], limit: int, voted_ids: set) -> ORJSONResponse:
+    """
+    Serialize a page of feed cards with orjson
+    
+    Cards from suggestion_card() already hold exactly the SuggestionResponse
+    fields as JSON-ready values, so per-row model validation is skipped.
+    The next-page cursor is attached as the X-Next-Cursor header.
+    """
+    response = ORJSONResponse([
+        {**card, "user_has_voted": card["id"] in voted_ids}
+        for card in cards
+    ])
+    cursor = next_cursor(cards, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return response
+
+
+async def _voted_ids(db: AsyncSession, user_id, suggestion_ids: List[str]) -> set:
+    """
+    Which of the given suggestions a user has voted on
+    
+    A bounded IN lookup on the votes primary key (user_id, suggestion_id),
+    so the cost scales with the page size, not the user's voting history
+    """
+    if not suggestion_ids:
+        return set()
+    result = await db.execute(
+        select(Vote.suggestion_id).where(
+            Vote.user_id == user_id,
+            Vote.suggestion_id.in_([uuid.UUID(suggestion_id) for suggestion_id in suggestion_ids])
+        )
     )
+    return {str(suggestion_id) for suggestion_id in result.scalars().all()}
 
 
 @router.get("", response_model=List[SuggestionResponse])
 async def get_suggestions(
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get all suggestions sorted by vote_count (most popular first)
     
     This is the "Feed" - automatically sorted by popularity
+    
+    - Keyset pagination: pass the X-Next-Cursor response header of the
+      previous page as ?cursor=... (skip is ignored when a cursor is given)
+    - Pages within the top FEED_CACHE_SIZE are served from the feed cache
     """
-    # Query suggestions ordered by vote_count DESC (thanks to the index!)
-    suggestions = db.query(Suggestion).order_by(
-        Suggestion.vote_count.desc()
-    ).offset(skip).limit(limit).all()
+    after = _parse_cursor(cursor)
     
-    # Check which suggestions the current user has voted on
-    user_votes = db.query(Vote.suggestion_id).filter(
-        Vote.user_id == current_user.id
-    ).all()
-    voted_suggestion_ids = {str(vote[0]) for vote in user_votes}
+    cards = None
+    if settings.FEED_CACHE_ENABLED:
+        cards = await feed_cache.page(db, limit, after=after, skip=skip)
     
-    # Build response with user_has_voted flag
-    return [
-        SuggestionResponse(
-            id=str(s.id),
-            user_id=str(s.user_id),
-            title=s.title,
-            description=s.description,
-            vote_count=s.vote_count,
-            status=s.status,
-            created_at=str(s.created_at),
-            user_has_voted=str(s.id) in voted_suggestion_ids
+    if cards is None:
+        # Ordered by (vote_count DESC, created_at, id) using idx_suggestions_feed
+        # The embedding column is not needed for the feed, so skip loading it
+        query = (
+            select(Suggestion)
+            .options(defer(Suggestion.embedding))
+            .order_by(*feed_order(Suggestion))
+            .limit(limit)
         )
-        for s in suggestions
-    ]
+        if after is not None:
+            query = query.where(after_cursor(Suggestion, after))
+        else:
+            query = query.offset(skip)
+        
+        result = await db.execute(query)
+        cards = [
+            suggestion_card(s, vote_counter_buffer.overlay(s.id, s.vote_count))
+            for s in result.scalars().all()
+        ]
+    
+    # Check which suggestions on this page the current user has voted on
+    voted_suggestion_ids = await _voted_ids(db, current_user.id, [card["id"] for card in cards])
+    
+    # Build response with user_has_voted flag
+    return _card_list_response(cards, limit, voted_suggestion_ids)
 
 
 @router.get("/{suggestion_id}", response_model=SuggestionResponse)
 async def get_suggestion(
     suggestion_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get a specific suggestion by ID
     """
-    suggestion = db.query(Suggestion).filter(Suggestion.id == uuid.UUID(suggestion_id)).first()
+    result = await db.execute(
+        select(Suggestion)
+        .options(defer(Suggestion.embedding))
+        .where(Suggestion.id == uuid.UUID(suggestion_id))
+    )
+    suggestion = result.scalar_one_or_none()
     
     if not suggestion:
         raise HTTPException(
@@ -237,17 +354,20 @@ async def get_suggestion(
         )
     
     # Check if user has voted
-    user_vote = db.query(Vote).filter(
-        Vote.user_id == current_user.id,
-        Vote.suggestion_id == suggestion.id
-    ).first()
+    result = await db.execute(
+        select(Vote.suggestion_id).where(
+            Vote.user_id == current_user.id,
+            Vote.suggestion_id == suggestion.id
+        )
+    )
+    user_vote = result.first()
     
     return SuggestionResponse(
         id=str(suggestion.id),
         user_id=str(suggestion.user_id),
         title=suggestion.title,
         description=suggestion.description,
-        vote_count=suggestion.vote_count,
+        vote_count=vote_counter_buffer.overlay(suggestion.id, suggestion.vote_count),
         status=suggestion.status,
         created_at=str(suggestion.created_at),
         user_has_voted=user_vote is not None
@@ -257,8 +377,8 @@ async def get_suggestion(
 @router.post("/{suggestion_id}/vote", response_model=VoteResponse)
 async def toggle_vote(
     suggestion_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Toggle vote on a suggestion (upvote or remove vote)
@@ -266,72 +386,82 @@ async def toggle_vote(
     - If user hasn't voted: Add vote and increment vote_count
     - If user has voted: Remove vote and decrement vote_count
     
-    This is ATOMIC - uses database transaction
+    This is ATOMIC - a single statement deletes or inserts the vote and
+    adjusts vote_count together, in one round trip
+    
+    With VOTE_WRITE_BEHIND_ENABLED the vote row is still written here, but
+    the vote_count change is buffered and flushed in batches
     """
-    suggestion = db.query(Suggestion).filter(
-        Suggestion.id == uuid.UUID(suggestion_id)
-    ).first()
+    suggestion_uuid = uuid.UUID(suggestion_id)
+    write_behind = settings.VOTE_WRITE_BEHIND_ENABLED
+    result = await db.execute(
+        TOGGLE_VOTE_DEFERRED_COUNT if write_behind else TOGGLE_VOTE,
+        {
+            "user_id": current_user.id,
+            "suggestion_id": suggestion_uuid
+        }
+    )
+    row = result.one()
     
-    if not suggestion:
+    if row.vote_count is None:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Suggestion not found"
         )
     
-    # Check if user has already voted
-    existing_vote = db.query(Vote).filter(
-        Vote.user_id == current_user.id,
-        Vote.suggestion_id == suggestion.id
-    ).first()
-    
-    if existing_vote:
-        # Remove vote (downvote)
-        db.delete(existing_vote)
-        suggestion.vote_count -= 1
-        user_has_voted = False
-    else:
-        # Add vote (upvote)
-        new_vote = Vote(
-            user_id=current_user.id,
-            suggestion_id=suggestion.id
-        )
-        db.add(new_vote)
-        suggestion.vote_count += 1
-        user_has_voted = True
+    await db.commit()
+    
+    new_vote_count = row.vote_count
+    if write_behind:
+        vote_counter_buffer.record(suggestion_uuid, row.delta)
+        new_vote_count = vote_counter_buffer.overlay(suggestion_uuid, row.vote_count)
     
-    db.commit()
-    db.refresh(suggestion)
+    # Move the card to its new rank in the cached feed
+    feed_cache.apply_vote(str(suggestion_uuid), new_vote_count)
     
     return VoteResponse(
-        suggestion_id=str(suggestion.id),
-        new_vote_count=suggestion.vote_count,
-        user_has_voted=user_has_voted
+        suggestion_id=str(suggestion_uuid),
+        new_vote_count=new_vote_count,
+        user_has_voted=row.user_has_voted
     )
 
 
 @router.get("/my/votes", response_model=List[SuggestionResponse])
 async def get_my_votes(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get all suggestions the current user has voted on
+    
+    Returns every voted suggestion unless limit or cursor is given; then it
+    is paginated like the feed: follow the X-Next-Cursor response header
     """
+    after = _parse_cursor(cursor)
+    if limit is None and after is not None:
+        limit = 100
+    
     # Get suggestion IDs the user voted on
-    voted_suggestions = db.query(Suggestion).join(Vote).filter(
-        Vote.user_id == current_user.id
-    ).order_by(Suggestion.vote_count.desc()).all()
-    
-    return [
-        SuggestionResponse(
-            id=str(s.id),
-            user_id=str(s.user_id),
-            title=s.title,
-            description=s.description,
-            vote_count=s.vote_count,
-            status=s.status,
-            created_at=str(s.created_at),
-            user_has_voted=True
-        )
-        for s in voted_suggestions
+    query = (
+        select(Suggestion)
+        .options(defer(Suggestion.embedding))
+        .join(Vote)
+        .where(Vote.user_id == current_user.id)
+        .order_by(*feed_order(Suggestion))
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    if after is not None:
+        query = query.where(after_cursor(Suggestion, after))
+    
+    result = await db.execute(query)
+    cards = [
+        suggestion_card(s, vote_counter_buffer.overlay(s.id, s.vote_count))
+        for s in result.scalars().all()
     ]
+    
+    # Unpaged (limit None): no next cursor
+    return _card_list_response(cards, limit or 0, {card["id"] for card in cards})
@@ -0,0 +1,288 @@
+"""
+Near-Duplicate Clustering Job
+Finds groups of near-duplicate suggestions across the whole table: streams
+all embeddings into a memory-mapped matrix, compares every pair in blocks
+on a process pool, unions the pairs above the threshold into clusters and
+writes them to duplicate_clusters for manager review (GET /admin/duplicate-clusters)
+
+Each run replaces the pending clusters of earlier runs; clusters a manager
+already confirmed or dismissed are kept and not proposed again.
+
+Usage:
+    python scripts/cluster_duplicates.py
+    python scripts/cluster_duplicates.py --threshold 0.9 --workers 8
+    python scripts/cluster_duplicates.py --dry-run
+"""
+import os
+
+# One BLAS thread per worker: the process pool provides the parallelism
+# (must be set before NumPy is imported)
+for _variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_variable, "1")
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy import delete, insert, select
+from database.connection import async_engine, engine
+from database.models import DuplicateCluster, DuplicateClusterMember, Suggestion
+
+
+DIMENSIONS = 1536
+
+# Rows per comparison block: a 2048 x 1536 float32 block is 12 MB and a
+# block-pair similarity tile 16 MB, so a worker's working set stays small
+# whatever the table size
+BLOCK_ROWS = 2048
+
+# Embeddings fetched per round trip while streaming
+FETCH_ROWS = 5000
+
+# Rows per INSERT when writing clusters
+INSERT_BATCH_SIZE = 1000
+
+# Memory-mapped embedding matrix, opened once per worker process
+_matrix = None
+
+
+async def _stream_embeddings(path: str) -> list:
+    # The async engine receives vectors in binary form (see
+    # database.connection), which avoids parsing 1536 decimals per row
+    ids = []
+    with open(path, "wb") as output:
+        async with async_engine.connect() as conn:
+            result = await conn.stream(
+                select(Suggestion.id, Suggestion.embedding)
+                .where(Suggestion.embedding.is_not(None))
+                .execution_options(yield_per=FETCH_ROWS)
+            )
+            async for rows in result.partitions():
+                block = np.stack([np.asarray(row.embedding, dtype=np.float32) for row in rows])
+                norms = np.linalg.norm(block, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                output.write((block / norms).astype(np.float32).tobytes())
+                ids.extend(row.id for row in rows)
+    await async_engine.dispose()
+    return ids
+
+
+def load_embeddings(path: str) -> list:
+    """
+    Stream all embeddings into a memory-mapped file as unit-length float32 rows
+
+    Only the suggestion ids are kept in memory; the matrix lives in the
+    file and is shared by the worker processes through the page cache.
+
+    Returns:
+        Suggestion ids, in matrix row order
+    """
+    return asyncio.run(_stream_embeddings(path))
+
+
+def _init_worker(path: str, rows: int) -> None:
+    global _matrix
+    _matrix = np.memmap(path, dtype=np.float32, mode="r", shape=(rows, DIMENSIONS))
+
+
+def _compare_block(start: int, threshold: float, block_rows: int) -> tuple:
+    """
+    Pairs above the threshold between the block starting at row start and
+    every row from start on (each pair once, no self-pairs)
+
+    Returns:
+        (rows, columns, similarities) arrays, with rows < columns
+    """
+    total = _matrix.shape[0]
+    block = np.array(_matrix[start:start + block_rows])
+    found_rows, found_columns, found_similarities = [], [], []
+
+    for other_start in range(start, total, block_rows):
+        similarities = block @ _matrix[other_start:other_start + block_rows].T
+        if other_start == start:
+            # Diagonal tile: keep the upper triangle only
+            similarities = np.triu(similarities, k=1)
+        rows, columns = np.nonzero(similarities >= threshold)
+        if rows.size:
+            found_rows.append(rows + start)
+            found_columns.append(columns + other_start)
+            found_similarities.append(similarities[rows, columns])
+
+    if not found_rows:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float32)
+    return np.concatenate(found_rows), np.concatenate(found_columns), np.concatenate(found_similarities)
+
+
+def find_pairs(path: str, rows: int, threshold: float, workers: int, block_rows: int = BLOCK_ROWS) -> tuple:
+    """
+    All pairs of rows with cosine similarity >= threshold
+
+    Row blocks are compared against every later block on a process pool.
+    The first blocks have the most work and are submitted first, which
+    keeps the workers balanced.
+
+    Returns:
+        (rows, columns, similarities) arrays
+    """
+    starts = range(0, rows, block_rows)
+    found = ([], [], [])
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path, rows)) as pool:
+        for done, pairs in enumerate(pool.map(_compare_block, starts, [threshold] * len(starts), [block_rows] * len(starts)), 1):
+            for collected, array in zip(found, pairs):
+                collected.append(array)
+            if done % 25 == 0 or done == len(starts):
+                print(f"   {done}/{len(starts)} blocks compared...")
+
+    return tuple(np.concatenate(collected) for collected in found)
+
+
+def union_clusters(rows: int, pair_rows, pair_columns) -> list:
+    """
+    Group rows connected by pairs into clusters (union-find with path halving)
+
+    Returns:
+        Lists of row indices, one per cluster of two or more rows
+    """
+    parent = list(range(rows))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in zip(pair_rows.tolist(), pair_columns.tolist()):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    clusters = {}
+    for row in set(pair_rows.tolist()) | set(pair_columns.tolist()):
+        clusters.setdefault(find(row), []).append(row)
+    return list(clusters.values())
+
+
+def write_clusters(run_id: uuid.UUID, threshold: float, clusters: list, ids: list, best) -> int:
+    """
+    Replace the pending clusters with the clusters of this run
+
+    Clusters with the same members as one a manager already reviewed are skipped.
+
+    Returns:
+        Number of clusters written
+    """
+    with engine.begin() as conn:
+        reviewed = {}
+        for cluster_id, suggestion_id in conn.execute(
+            select(DuplicateClusterMember.cluster_id, DuplicateClusterMember.suggestion_id)
+            .join(DuplicateCluster)
+            .where(DuplicateCluster.status != "pending")
+        ):
+            reviewed.setdefault(cluster_id, set()).add(suggestion_id)
+        reviewed = {frozenset(members) for members in reviewed.values()}
+
+        conn.execute(delete(DuplicateCluster).where(DuplicateCluster.status == "pending"))
+
+        cluster_rows, member_rows = [], []
+        for members in clusters:
+            if frozenset(ids[row] for row in members) in reviewed:
+                continue
+            cluster_id = uuid.uuid4()
+            cluster_rows.append({
+                "id": cluster_id,
+                "run_id": run_id,
+                "threshold": threshold,
+                "size": len(members),
+                "max_similarity": float(max(best[row] for row in members)),
+                "status": "pending"
+            })
+            member_rows.extend(
+                {"cluster_id": cluster_id, "suggestion_id": ids[row], "similarity": float(best[row])}
+                for row in members
+            )
+
+        for start in range(0, len(cluster_rows), INSERT_BATCH_SIZE):
+            conn.execute(insert(DuplicateCluster), cluster_rows[start:start + INSERT_BATCH_SIZE])
+        for start in range(0, len(member_rows), INSERT_BATCH_SIZE):
+            conn.execute(insert(DuplicateClusterMember), member_rows[start:start + INSERT_BATCH_SIZE])
+    return len(cluster_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=float, default=0.85, help="Minimum cosine similarity of a duplicate pair")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: CPU count)")
+    parser.add_argument("--block-rows", type=int, default=BLOCK_ROWS, help="Rows per comparison block")
+    parser.add_argument("--dry-run", action="store_true", help="Print the clusters summary without writing it")
+    args = parser.parse_args()
+
+    if not 0 < args.threshold <= 1:
+        print("❌ --threshold must be in (0, 1]")
+        return False
+
+    print("=" * 60)
+    print(f"🔎 Near-Duplicate Clustering (threshold {args.threshold})")
+    print("=" * 60)
+    print()
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "embeddings.f32")
+
+            started = time.monotonic()
+            print("📥 Streaming embeddings...")
+            ids = load_embeddings(path)
+            print(f"✅ {len(ids)} embeddings loaded in {time.monotonic() - started:.1f}s")
+            print()
+            if not ids:
+                print("ℹ️  No embeddings to cluster (the table is empty)")
+                return True
+
+            started = time.monotonic()
+            print(f"🧮 Comparing all pairs on {args.workers} processes...")
+            pair_rows, pair_columns, similarities = find_pairs(
+                path, len(ids), args.threshold, args.workers, args.block_rows
+            )
+            print(f"✅ {len(similarities)} pairs found in {time.monotonic() - started:.1f}s")
+            print()
+
+        # Highest similarity of each row to any other row
+        best = np.zeros(len(ids), dtype=np.float32)
+        np.maximum.at(best, pair_rows, similarities)
+        np.maximum.at(best, pair_columns, similarities)
+
+        clusters = union_clusters(len(ids), pair_rows, pair_columns)
+        clustered = sum(len(members) for members in clusters)
+        print(f"📊 {len(clusters)} clusters covering {clustered} suggestions")
+        if clusters:
+            print(f"   Largest cluster: {max(len(members) for members in clusters)} suggestions")
+        print()
+
+        if args.dry_run:
+            print("ℹ️  Dry run, nothing written")
+            return True
+
+        written = write_clusters(uuid.uuid4(), args.threshold, clusters, ids, best)
+        print(f"✅ {written} clusters written for review ({len(clusters) - written} already reviewed)")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
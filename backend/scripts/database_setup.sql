@@ -42,6 +42,10 @@ CREATE TABLE IF NOT EXISTS suggestions (
     -- AI embedding vector (1536 dimensions for OpenAI text-embedding-3-small)
     embedding vector(1536),
     
+    -- First 256 dimensions of embedding, re-normalized (Matryoshka), used for
+    -- fast candidate search when VECTOR_CANDIDATE_MODE = matryoshka
+    embedding_short vector(256),
+    
     -- Vote counter (indexed for fast sorting)
     vote_count INTEGER DEFAULT 0,
     
@@ -54,11 +58,32 @@ CREATE TABLE IF NOT EXISTS suggestions (
 -- Critical Index: Makes sorting by vote_count instant even with 100k+ rows
 CREATE INDEX IF NOT EXISTS idx_suggestions_vote_count ON suggestions(vote_count DESC);
 
+-- Feed ordering index for keyset (cursor) pagination:
+-- ORDER BY vote_count DESC, created_at, id with "after cursor" range scans
+CREATE INDEX IF NOT EXISTS idx_suggestions_feed ON suggestions(vote_count DESC, created_at, id);
+
 -- Index for vector similarity search (cosine distance)
+-- lists is only a starting point for an empty table: retrain it as data
+-- grows with scripts/manage_vector_index.py rebuild --if-needed
 CREATE INDEX IF NOT EXISTS idx_suggestions_embedding ON suggestions 
 USING ivfflat (embedding vector_cosine_ops)
 WITH (lists = 100);
 
+-- Existing databases: add the short embedding column (backfill and index it
+-- with scripts/quantize_embeddings.py matryoshka)
+ALTER TABLE suggestions ADD COLUMN IF NOT EXISTS embedding_short vector(256);
+-- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_suggestions_embedding_short ON suggestions
+-- USING hnsw (embedding_short vector_cosine_ops);
+
+-- Optional (pgvector >= 0.7): quantized expression indexes for
+-- VECTOR_CANDIDATE_MODE = halfvec / binary. Candidates found on these are
+-- re-ranked with the full-precision column. Prefer running
+-- scripts/quantize_embeddings.py, which also checks recall.
+-- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_suggestions_embedding_halfvec ON suggestions
+-- USING hnsw ((embedding::halfvec(1536)) halfvec_cosine_ops);
+-- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_suggestions_embedding_binary ON suggestions
+-- USING hnsw ((binary_quantize(embedding)::bit(1536)) bit_hamming_ops);
+
 
 -- 3. Votes Table
 -- Tracks which users voted on which suggestions (prevents duplicate voting)
@@ -78,6 +103,60 @@ CREATE INDEX IF NOT EXISTS idx_votes_user_id ON votes(user_id);
 CREATE INDEX IF NOT EXISTS idx_votes_suggestion_id ON votes(suggestion_id);
 
 
+-- 4. Embedding Cache Table
+-- Persistent tier of the embedding cache (key = SHA-256 of model, API version and text)
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    key VARCHAR(64) PRIMARY KEY,
+    model VARCHAR(100) NOT NULL,
+    embedding vector(1536) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Index for TTL expiry scans
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_created_at ON embedding_cache(created_at);
+
+-- 5. Refresh Tokens Table
+-- Rotating refresh tokens (stored as SHA-256 hashes, never in plain text)
+CREATE TABLE IF NOT EXISTS refresh_tokens (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    token_hash VARCHAR(64) UNIQUE NOT NULL,
+    family_id UUID NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    revoked_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Indexes for revoking all tokens of a user or of one login (token family)
+CREATE INDEX IF NOT EXISTS idx_refresh_tokens_user_id ON refresh_tokens(user_id);
+CREATE INDEX IF NOT EXISTS idx_refresh_tokens_family_id ON refresh_tokens(family_id);
+
+-- 6. Duplicate Clusters Tables
+-- Near-duplicate groups found offline by scripts/cluster_duplicates.py,
+-- reviewed by managers
+CREATE TABLE IF NOT EXISTS duplicate_clusters (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    run_id UUID NOT NULL,
+    threshold DOUBLE PRECISION NOT NULL,
+    size INTEGER NOT NULL,
+    max_similarity DOUBLE PRECISION NOT NULL,
+    status VARCHAR(50) DEFAULT 'pending',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS duplicate_cluster_members (
+    cluster_id UUID REFERENCES duplicate_clusters(id) ON DELETE CASCADE,
+    suggestion_id UUID REFERENCES suggestions(id) ON DELETE CASCADE,
+    similarity DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (cluster_id, suggestion_id)
+);
+
+-- Indexes for replacing a run's pending clusters and finding a suggestion's cluster
+CREATE INDEX IF NOT EXISTS idx_duplicate_clusters_run_id ON duplicate_clusters(run_id);
+CREATE INDEX IF NOT EXISTS idx_duplicate_clusters_status ON duplicate_clusters(status);
+CREATE INDEX IF NOT EXISTS idx_duplicate_cluster_members_suggestion_id ON duplicate_cluster_members(suggestion_id);
+
+
 -- Sample Data (Optional - for testing)
 -- ================================================================
 
@@ -119,7 +198,8 @@ SELECT
     pg_size_pretty(pg_total_relation_size(quote_ident(table_name))) AS size
 FROM information_schema.tables
 WHERE table_schema = 'public'
-AND table_name IN ('users', 'suggestions', 'votes')
+AND table_name IN ('users', 'suggestions', 'votes', 'embedding_cache', 'refresh_tokens',
+                   'duplicate_clusters', 'duplicate_cluster_members')
 ORDER BY table_name;
 
 -- Check indexes
@@ -129,7 +209,8 @@ SELECT
     indexdef
 FROM pg_indexes
 WHERE schemaname = 'public'
-AND tablename IN ('users', 'suggestions', 'votes')
+AND tablename IN ('users', 'suggestions', 'votes', 'embedding_cache', 'refresh_tokens',
+                   'duplicate_clusters', 'duplicate_cluster_members')
 ORDER BY tablename, indexname;
 
 
@@ -141,10 +222,23 @@ ORDER BY tablename, indexname;
 --    - Makes ORDER BY vote_count DESC instant
 --    - Critical for the "Top to Bottom" ranking feature
 --
+-- 1b. Feed Index (idx_suggestions_feed):
+--    - Matches ORDER BY vote_count DESC, created_at, id exactly
+--    - Cursor pages cost the same as page 1 (no OFFSET scan)
+--
 -- 2. Vector Index (idx_suggestions_embedding):
 --    - Uses IVFFlat algorithm for fast similarity search
 --    - lists = 100 is good for up to 100k suggestions
---    - Adjust lists value as data grows (rule: sqrt(rows))
+--    - Adjust lists value as data grows (rule: sqrt(rows)):
+--      scripts/manage_vector_index.py rebuild --if-needed does this
+--      concurrently (and can migrate to HNSW with --method hnsw)
+--    - Search effort is set per query (ivfflat.probes / hnsw.ef_search):
+--      low while typing, high for duplicate checks
+--    - Only used by queries of the form ORDER BY embedding <=> q LIMIT k;
+--      scripts/test_vector_index_usage.py checks the plans with EXPLAIN
+--    - Quantized variants (halfvec: 2x smaller, binary: 32x smaller) and the
+--      256-d embedding_short index (6x smaller) serve candidate search only;
+--      results are re-ranked exactly
 --
 -- 3. Composite Primary Key (votes table):
 --    - Database-level enforcement of "one vote per user per suggestion"
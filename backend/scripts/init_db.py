@@ -10,7 +10,9 @@ backend_path = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_path))
 
 from database.connection import Base, engine
-from database.models import User, Suggestion, Vote
+from database.models import (
+    User, Suggestion, Vote, EmbeddingCacheEntry, RefreshToken, DuplicateCluster, DuplicateClusterMember
+)
 
 def init_database():
     """Create all database tables"""
@@ -24,6 +26,10 @@ def init_database():
         print("   - users")
         print("   - suggestions")
         print("   - votes")
+        print("   - embedding_cache")
+        print("   - refresh_tokens")
+        print("   - duplicate_clusters")
+        print("   - duplicate_cluster_members")
         print()
         
         # Create all tables
@@ -49,6 +55,7 @@ def init_database():
         print("  - title (String)")
         print("  - description (Text)")
         print("  - embedding (Vector[1536]) ← pgvector for AI")
+        print("  - embedding_short (Vector[256]) ← Matryoshka prefix for candidate search")
         print("  - vote_count (Integer, Indexed)")
         print("  - status (String)")
         print("  - created_at (Timestamp)")
@@ -58,6 +65,35 @@ def init_database():
         print("  - suggestion_id (UUID, Primary Key)")
         print("  - voted_at (Timestamp)")
         print()
+        print("Table: embedding_cache")
+        print("  - key (String, Primary Key) ← SHA-256 of model + text")
+        print("  - model (String)")
+        print("  - embedding (Vector[1536])")
+        print("  - created_at (Timestamp, Indexed)")
+        print()
+        print("Table: refresh_tokens")
+        print("  - id (UUID, Primary Key)")
+        print("  - user_id (UUID, Foreign Key → users)")
+        print("  - token_hash (String, Unique) ← SHA-256 of the token")
+        print("  - family_id (UUID, Indexed)")
+        print("  - expires_at (Timestamp)")
+        print("  - revoked_at (Timestamp)")
+        print("  - created_at (Timestamp)")
+        print()
+        print("Table: duplicate_clusters")
+        print("  - id (UUID, Primary Key)")
+        print("  - run_id (UUID, Indexed) ← clustering job")
+        print("  - threshold (Float)")
+        print("  - size (Integer)")
+        print("  - max_similarity (Float)")
+        print("  - status (String, Indexed)")
+        print("  - created_at (Timestamp)")
+        print()
+        print("Table: duplicate_cluster_members")
+        print("  - cluster_id (UUID, Primary Key)")
+        print("  - suggestion_id (UUID, Primary Key, Indexed)")
+        print("  - similarity (Float)")
+        print()
         print("=" * 60)
         print("✅ Your database is ready to use!")
         print("=" * 60)
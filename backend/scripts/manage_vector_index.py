@@ -0,0 +1,103 @@
+"""
+Vector Index Maintenance Command
+Shows the state of idx_suggestions_embedding, measures its recall and
+rebuilds it concurrently (ivfflat with lists ~ sqrt(rows), or HNSW)
+
+Usage:
+    python scripts/manage_vector_index.py status
+    python scripts/manage_vector_index.py recall --sample 200
+    python scripts/manage_vector_index.py rebuild                  # same method, ivfflat lists = sqrt(rows)
+    python scripts/manage_vector_index.py rebuild --if-needed      # for cron: only on drift / low recall
+    python scripts/manage_vector_index.py rebuild --method hnsw
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from database.connection import engine
+from database.vector_maintenance import index_status, measure_recall, needs_rebuild, rebuild_index
+
+
+def print_status(status: dict) -> None:
+    """Print an index_status() dictionary"""
+    if not status["exists"]:
+        print("⚠️  idx_suggestions_embedding does not exist")
+        print(f"   Rows with embeddings: {status['rows']}")
+        return
+
+    print(f"📋 Method: {status['method']}  Options: {status['options'] or '-'}")
+    print(f"   Rows with embeddings: {status['rows']}")
+    if status["built_rows"] is not None:
+        print(f"   Built on {status['built_rows']} rows at {status['built_at']} (drift {status['row_drift']:.2f}x)")
+    else:
+        print("   Build not tracked (created by database_setup.sql or by hand)")
+    if status["method"] == "ivfflat":
+        print(f"   Recommended lists: {status['recommended_lists']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["status", "recall", "rebuild"])
+    parser.add_argument("--method", choices=["ivfflat", "hnsw"], help="Default: keep the current method (ivfflat if none)")
+    parser.add_argument("--lists", type=int, help="ivfflat lists (default: sqrt(rows))")
+    parser.add_argument("--m", type=int, default=16, help="HNSW m")
+    parser.add_argument("--ef-construction", type=int, default=64, help="HNSW ef_construction")
+    parser.add_argument("--if-needed", action="store_true", help="Rebuild only on row drift or low recall")
+    parser.add_argument("--sample", type=int, default=100, help="Query embeddings for the recall check")
+    parser.add_argument("--k", type=int, default=5, help="Results compared per query")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🔧 Vector Index Maintenance")
+    print("=" * 60)
+    print()
+
+    try:
+        with engine.connect() as conn:
+            status = index_status(conn)
+            print_status(status)
+            print()
+
+            recall = None
+            if args.command == "recall" or (args.command == "rebuild" and args.if_needed and status["exists"]):
+                recall = measure_recall(conn, sample=args.sample, k=args.k)
+                if recall is None:
+                    print("ℹ️  No embeddings to check (the table is empty)")
+                else:
+                    print(f"📊 recall@{args.k} (recall profile): {recall:.3f}")
+                print()
+
+        if args.command != "rebuild":
+            return True
+
+        if args.if_needed:
+            reason = needs_rebuild(status, recall)
+            if reason is None:
+                print("✅ Index is healthy, nothing to do")
+                return True
+            print(f"🔁 Rebuilding: {reason}")
+
+        method = args.method or (status["method"] if status["exists"] else "ivfflat")
+        print(f"📦 Building {method} index CONCURRENTLY (searches and writes keep working)...")
+        build = rebuild_index(
+            engine,
+            method=method,
+            lists=args.lists,
+            m=args.m,
+            ef_construction=args.ef_construction
+        )
+        print(f"✅ Rebuilt: {build}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,173 @@
+"""
+Candidate Index Migration
+Creates the indexes used by VECTOR_CANDIDATE_MODE (halfvec / binary
+expression indexes, or the backfilled 256-d embedding_short column for
+matryoshka) and measures their recall against exact search before you
+switch modes
+
+Usage:
+    python scripts/quantize_embeddings.py halfvec
+    python scripts/quantize_embeddings.py matryoshka
+    python scripts/quantize_embeddings.py binary --sample 200 --k 5
+    python scripts/quantize_embeddings.py binary --check-only
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy import bindparam, select, text, update
+from database.connection import engine
+from database.models import Suggestion
+from database.vector_maintenance import RECALL_TARGET, measure_recall
+from utils.ai import shorten_embedding
+from core.config import settings
+
+
+# halfvec / binary indexes are built from the float32 column, so no data is
+# rewritten: halfvec halves index size, binary shrinks it 32x. The
+# matryoshka index covers the 256-d embedding_short column (6x smaller).
+INDEXES = {
+    "halfvec": """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_suggestions_embedding_halfvec ON suggestions
+        USING hnsw ((embedding::halfvec(1536)) halfvec_cosine_ops)
+    """,
+    "binary": """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_suggestions_embedding_binary ON suggestions
+        USING hnsw ((binary_quantize(embedding)::bit(1536)) bit_hamming_ops)
+    """,
+    "matryoshka": """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_suggestions_embedding_short ON suggestions
+        USING hnsw (embedding_short vector_cosine_ops)
+    """
+}
+
+# Oldest pgvector providing each index type
+MIN_PGVECTOR_VERSION = {
+    "halfvec": (0, 7, 0),
+    "binary": (0, 7, 0),
+    "matryoshka": (0, 5, 0)
+}
+
+# Rows shortened per UPDATE batch during the matryoshka backfill
+BACKFILL_BATCH_SIZE = 500
+
+
+def pgvector_version(conn) -> tuple:
+    """Installed pgvector version as a tuple of ints"""
+    version = conn.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+    if version is None:
+        return ()
+    return tuple(int(part) for part in version.split("."))
+
+
+def create_index(mode: str) -> bool:
+    """Create the expression index for a mode (CONCURRENTLY, outside a transaction)"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        version = pgvector_version(conn)
+        required = MIN_PGVECTOR_VERSION[mode]
+        if version < required:
+            print(
+                f"❌ pgvector >= {'.'.join(map(str, required))} is required for {mode} indexes "
+                f"(installed: {'.'.join(map(str, version)) or 'none'})"
+            )
+            return False
+
+        print(f"📦 Creating {mode} index (CONCURRENTLY, writes keep working)...")
+        conn.execute(text(INDEXES[mode]))
+        print("✅ Index ready")
+        return True
+
+
+def backfill_short_embeddings() -> int:
+    """
+    Add embedding_short if missing and fill it for rows that lack it
+
+    Returns:
+        Number of rows backfilled
+    """
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE suggestions ADD COLUMN IF NOT EXISTS embedding_short vector(256)"))
+
+    table = Suggestion.__table__
+    backfilled = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.embedding)
+                .where(table.c.embedding_short.is_(None), table.c.embedding.is_not(None))
+                .limit(BACKFILL_BATCH_SIZE)
+            ).fetchall()
+            if not rows:
+                return backfilled
+
+            conn.execute(
+                update(table)
+                .where(table.c.id == bindparam("row_id"))
+                .values(embedding_short=bindparam("short")),
+                [{"row_id": row.id, "short": shorten_embedding(list(row.embedding))} for row in rows]
+            )
+        backfilled += len(rows)
+        print(f"   {backfilled} rows shortened...")
+
+
+def check_recall(mode: str, sample: int, k: int) -> float:
+    """
+    Compare the candidate search of a mode with exact search
+
+    Returns:
+        Mean recall@k over the sample
+    """
+    with engine.connect() as conn:
+        recall = measure_recall(conn, mode=mode, sample=sample, k=k)
+    if recall is None:
+        print("ℹ️  No embeddings to check (the table is empty)")
+        return 1.0
+
+    print(f"📊 {mode} recall@{k} over up to {sample} queries: {recall:.3f}")
+    print(f"   (re-ranking {max(k, settings.VECTOR_RERANK_CANDIDATES)} candidates per query)")
+    return recall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=sorted(INDEXES))
+    parser.add_argument("--sample", type=int, default=100, help="Number of query embeddings to sample")
+    parser.add_argument("--k", type=int, default=5, help="Results compared per query")
+    parser.add_argument("--check-only", action="store_true", help="Skip index creation")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"🔧 Candidate search: {args.mode}")
+    print("=" * 60)
+    print()
+
+    try:
+        if not args.check_only:
+            if args.mode == "matryoshka":
+                print("📋 Backfilling embedding_short...")
+                print(f"✅ {backfill_short_embeddings()} rows backfilled")
+                print()
+            if not create_index(args.mode):
+                return False
+        print()
+
+        recall = check_recall(args.mode, args.sample, args.k)
+        print()
+        if recall >= RECALL_TARGET:
+            print(f"✅ Recall meets the {RECALL_TARGET} target, set VECTOR_CANDIDATE_MODE={args.mode}")
+        else:
+            print(f"⚠️  Recall is below {RECALL_TARGET}: raise VECTOR_RERANK_CANDIDATES and re-run with --check-only")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,58 @@
+"""
+User Role Command
+Promotes a registered user to manager (or demotes them back to ambassador).
+/auth/register only creates ambassadors, so this is how managers are made.
+
+Usage:
+    python scripts/set_user_role.py ali@studentambassadors.com manager
+    python scripts/set_user_role.py ali@studentambassadors.com ambassador
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy import select
+from database.connection import SessionLocal
+from database.models import User
+from core.config import settings
+
+
+ROLES = ("ambassador", "manager")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("email")
+    parser.add_argument("role", choices=ROLES)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🎭 Setting User Role")
+    print("=" * 60)
+
+    try:
+        with SessionLocal() as db:
+            user = db.execute(select(User).where(User.email == args.email)).scalar_one_or_none()
+            if user is None:
+                print(f"❌ No user registered with {args.email}")
+                return False
+
+            previous = user.role
+            user.role = args.role
+            db.commit()
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+    print(f"✅ {args.email}: {previous} -> {args.role}")
+    print(f"   Running workers pick it up within {settings.PRINCIPAL_CACHE_TTL_SECONDS:g}s (principal cache)")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
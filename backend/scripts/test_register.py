@@ -14,7 +14,7 @@ user_data = {
     "email": "ali@studentambassadors.com",
     "password": "StrongPassword123!",
     "full_name": "Ali Arabi",
-    "role": "manager"
+    "role": "ambassador"
 }
 
 print("📤 Sending registration request...")
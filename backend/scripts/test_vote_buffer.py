@@ -0,0 +1,153 @@
+"""
+Test Script for the Vote Counter Buffer
+Checks that overlay() never counts a flushed delta twice while the flush
+commits, that a failed flush keeps its deltas, and that reconcile() only
+repairs a drift seen twice (no database needed)
+"""
+import asyncio
+import sys
+import uuid
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from utils.vote_buffer import FIND_VOTE_COUNT_DRIFT, VoteCounterBuffer
+
+
+class FakeSession:
+    """
+    Session double holding one committed vote_count
+
+    The UPDATE is applied to the committed value as soon as commit() starts,
+    i.e. the worst case where other sessions see the new count before the
+    commit round trip returns. on_execute / on_commit run mid-statement, like
+    a concurrent request being served while the flush is awaited.
+    """
+
+    def __init__(self, vote_count: int, fail_commit: bool = False):
+        self.vote_count = vote_count
+        self.fail_commit = fail_commit
+        self.uncommitted = 0
+        self.on_execute = None
+        self.on_commit = None
+
+    async def execute(self, statement, params):
+        if self.on_execute:
+            self.on_execute()
+        await asyncio.sleep(0)
+        self.uncommitted = sum(params["deltas"])
+
+    async def commit(self):
+        if self.fail_commit:
+            raise RuntimeError("commit failed")
+        self.vote_count += self.uncommitted
+        self.uncommitted = 0
+        if self.on_commit:
+            self.on_commit()
+        await asyncio.sleep(0)
+
+    async def rollback(self):
+        self.uncommitted = 0
+
+
+class DriftSession:
+    """Session double for reconcile(): vote rows and stored vote_count per suggestion"""
+
+    def __init__(self, votes: dict, vote_counts: dict):
+        self.votes = votes
+        self.vote_counts = vote_counts
+
+    def _drift(self, suggestion_id) -> int:
+        return self.votes[suggestion_id] - self.vote_counts[suggestion_id]
+
+    async def execute(self, statement, params=None):
+        if statement is FIND_VOTE_COUNT_DRIFT:
+            return [(i, self._drift(i)) for i in self.vote_counts if self._drift(i)]
+        fixed = 0
+        for suggestion_id, drift in zip(params["ids"], params["drifts"]):
+            if self._drift(suggestion_id) == drift:
+                self.vote_counts[suggestion_id] += drift
+                fixed += 1
+        return type("Result", (), {"rowcount": fixed})()
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+def check(name: str, actual: int, expected: int) -> bool:
+    if actual == expected:
+        print(f"✅ {name}: {actual}")
+        return True
+    print(f"❌ {name}: {actual} (expected {expected})")
+    return False
+
+
+async def run_checks() -> bool:
+    suggestion_id = uuid.uuid4()
+    results = []
+
+    # Flush window: readers before the UPDATE and during the commit
+    buffer = VoteCounterBuffer()
+    db = FakeSession(vote_count=10)
+    for _ in range(3):
+        buffer.record(suggestion_id, 1)
+    seen = {}
+    db.on_execute = lambda: seen.setdefault("execute", buffer.overlay(suggestion_id, db.vote_count))
+    db.on_commit = lambda: seen.setdefault("commit", buffer.overlay(suggestion_id, db.vote_count))
+    await buffer.flush(db)
+    results.append(check("Overlay while the UPDATE runs", seen["execute"], 13))
+    results.append(check("Overlay once the new count is committed", seen["commit"], 13))
+    results.append(check("Overlay after the flush", buffer.overlay(suggestion_id, db.vote_count), 13))
+
+    # Failed flush: deltas go back to pending and stay overlaid
+    buffer = VoteCounterBuffer()
+    db = FakeSession(vote_count=10, fail_commit=True)
+    buffer.record(suggestion_id, 1)
+    try:
+        await buffer.flush(db)
+    except RuntimeError:
+        pass
+    results.append(check("Overlay after a failed flush", buffer.overlay(suggestion_id, db.vote_count), 11))
+
+    db.fail_commit = False
+    await buffer.flush(db)
+    results.append(check("Overlay after the retry", buffer.overlay(suggestion_id, db.vote_count), 11))
+
+    # Reconcile: a lost delta is repaired on the second pass; a lag that
+    # a flush closes in between is left alone
+    lost, lagging = uuid.uuid4(), uuid.uuid4()
+    buffer = VoteCounterBuffer()
+    db = DriftSession(votes={lost: 5, lagging: 7}, vote_counts={lost: 4, lagging: 6})
+    results.append(check("Rows repaired on the first pass", await buffer.reconcile(db), 0))
+    db.vote_counts[lagging] += 1  # Another worker flushes its delta
+    results.append(check("Rows repaired on the second pass", await buffer.reconcile(db), 1))
+    results.append(check("Repaired vote_count", db.vote_counts[lost], 5))
+    results.append(check("Flushed vote_count", db.vote_counts[lagging], 7))
+
+    # Reconcile skips suggestions with deltas buffered in this worker
+    buffer = VoteCounterBuffer()
+    db = DriftSession(votes={lagging: 8}, vote_counts={lagging: 7})
+    buffer.record(lagging, 1)
+    await buffer.reconcile(db)
+    results.append(check("Rows repaired while buffered", await buffer.reconcile(db), 0))
+
+    return all(results)
+
+
+def main():
+    print("🧪 Testing Vote Counter Buffer...")
+    print("=" * 60)
+    passed = asyncio.run(run_checks())
+    print("=" * 60)
+    print("✅ All checks passed" if passed else "❌ Some checks failed")
+    return passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
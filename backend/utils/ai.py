@@ -2,10 +2,19 @@
 AI Utilities
 Azure OpenAI integration for embeddings and similarity detection
 """
-from openai import AzureOpenAI
+from openai import AzureOpenAI, AsyncAzureOpenAI
 from core.config import settings
+from sqlalchemy import bindparam, select, text
 from typing import List, Optional
+import httpx
 import numpy as np
+import uuid
+
+from database.types import Vector
+from utils.embedding_batcher import AsyncEmbeddingBatcher
+from utils.embedding_cache import embedding_cache, normalize_text
+from utils.shared_vectors import shared_vector_store
+from utils.vector_index import vector_index
 
 
 # Initialize Azure OpenAI client
@@ -15,23 +24,127 @@ client = AzureOpenAI(
     azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
 )
 
+# Async client for request handlers, sharing one keep-alive connection pool
+async_client = AsyncAzureOpenAI(
+    api_key=settings.AZURE_OPENAI_API_KEY,
+    api_version=settings.AZURE_OPENAI_API_VERSION,
+    azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+    http_client=httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.AZURE_OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AZURE_OPENAI_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    )
+)
+
+
+def get_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Generate embedding vectors for several texts in one Azure OpenAI call
+    
+    Args:
+        texts: Input texts to embed (already normalized)
+        
+    Returns:
+        One 1536-dimensional embedding vector per input text, in order
+    """
+    response = client.embeddings.create(
+        input=texts,
+        model=settings.AZURE_OPENAI_EMBEDDING_MODEL
+    )
+    
+    # The API does not guarantee output order, so sort by index
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+async def aget_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Async variant of get_embeddings using the shared AsyncAzureOpenAI client
+    
+    Args:
+        texts: Input texts to embed (already normalized)
+        
+    Returns:
+        One 1536-dimensional embedding vector per input text, in order
+    """
+    response = await async_client.embeddings.create(
+        input=texts,
+        model=settings.AZURE_OPENAI_EMBEDDING_MODEL
+    )
+    
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+# Coalesce concurrent embedding calls from request handlers into batched API requests
+async_embedding_batcher = AsyncEmbeddingBatcher(
+    aget_embeddings,
+    window_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+    max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE
+)
+
 
 def get_embedding(text: str) -> List[float]:
     """
     Generate embedding vector for text using Azure OpenAI
     
+    Results are cached by (model, API version, normalized text), so repeated
+    texts are served from memory or the embedding_cache table. Used by
+    scripts; request handlers use aget_embedding, which also batches.
+    
     Args:
         text: Input text to embed
         
     Returns:
         1536-dimensional embedding vector
     """
-    response = client.embeddings.create(
-        input=text,
-        model=settings.AZURE_OPENAI_EMBEDDING_MODEL
-    )
+    text = normalize_text(text)
+    
+    if settings.EMBEDDING_CACHE_ENABLED:
+        key = embedding_cache.key_for(text)
+        cached = embedding_cache.get(key)
+        if cached is not None:
+            return cached
+    
+    embedding = get_embeddings([text])[0]
     
-    return response.data[0].embedding
+    if settings.EMBEDDING_CACHE_ENABLED:
+        embedding_cache.set(key, embedding)
+    
+    return embedding
+
+
+async def aget_embedding(text: str) -> List[float]:
+    """
+    Generate embedding vector for text without blocking the event loop
+    
+    Same caching as get_embedding, but awaits the AsyncAzureOpenAI client, so
+    one worker can keep many requests in flight; cache misses from
+    concurrent requests are coalesced into a single batched API call.
+    
+    Args:
+        text: Input text to embed
+        
+    Returns:
+        1536-dimensional embedding vector
+    """
+    text = normalize_text(text)
+    
+    if settings.EMBEDDING_CACHE_ENABLED:
+        key = embedding_cache.key_for(text)
+        cached = await embedding_cache.aget(key)
+        if cached is not None:
+            return cached
+    
+    if settings.EMBEDDING_BATCH_ENABLED:
+        embedding = await async_embedding_batcher.embed(text)
+    else:
+        embedding = (await aget_embeddings([text]))[0]
+    
+    if settings.EMBEDDING_CACHE_ENABLED:
+        embedding_cache.aset(key, embedding)
+    
+    return embedding
 
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
@@ -55,58 +168,368 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     return dot_product / (norm_vec1 * norm_vec2)
 
 
+# Dimensions of the Matryoshka-shortened embedding stored in embedding_short
+SHORT_EMBEDDING_DIMENSIONS = 256
+
+
+# Query using pgvector's cosine distance operator (<=>)
+# Note: 1 - distance = similarity
+# The inner query must be exactly ORDER BY <distance> LIMIT k for PostgreSQL
+# to walk idx_suggestions_embedding in distance order; a WHERE on the
+# distance or ORDER BY a computed alias forces a sequential scan. The
+# threshold is applied to the ranked rows, and the outer ORDER BY restores
+# exact order after a relaxed iterative index scan.
+SIMILARITY_QUERY = text("""
+    WITH nearest AS (
+        SELECT id, title, description, vote_count,
+               embedding <=> CAST(:embedding AS vector) AS distance
+        FROM suggestions
+        ORDER BY embedding <=> CAST(:embedding AS vector)
+        LIMIT :limit
+    )
+    SELECT id, title, description, vote_count, 1 - distance AS similarity
+    FROM nearest
+    WHERE 1 - distance > :threshold
+    ORDER BY distance
+""").bindparams(bindparam("embedding", type_=Vector(1536)))
+
+
+# Candidate search on a quantized expression index (pgvector >= 0.7, see
+# scripts/quantize_embeddings.py), then exact re-ranking of the candidates
+# with the full-precision column. The ORDER BY expressions must match the
+# index expressions for PostgreSQL to use the indexes. The query vector is
+# always bound as a vector (and cast to halfvec in SQL), so re-ranking uses
+# its full precision.
+HALFVEC_SIMILARITY_QUERY = text("""
+    WITH candidates AS (
+        SELECT id, title, description, vote_count, embedding
+        FROM suggestions
+        WHERE embedding IS NOT NULL
+        ORDER BY embedding::halfvec(1536) <=> CAST(:embedding AS vector)::halfvec(1536)
+        LIMIT :candidates
+    )
+    SELECT id, title, description, vote_count,
+           1 - (embedding <=> CAST(:embedding AS vector)) as similarity
+    FROM candidates
+    WHERE 1 - (embedding <=> CAST(:embedding AS vector)) > :threshold
+    ORDER BY similarity DESC
+    LIMIT :limit
+""").bindparams(
+    bindparam("embedding", type_=Vector(1536))
+)
+
+BINARY_SIMILARITY_QUERY = text("""
+    WITH candidates AS (
+        SELECT id, title, description, vote_count, embedding
+        FROM suggestions
+        WHERE embedding IS NOT NULL
+        ORDER BY binary_quantize(embedding)::bit(1536) <~> binary_quantize(CAST(:embedding AS vector))
+        LIMIT :candidates
+    )
+    SELECT id, title, description, vote_count,
+           1 - (embedding <=> CAST(:embedding AS vector)) as similarity
+    FROM candidates
+    WHERE 1 - (embedding <=> CAST(:embedding AS vector)) > :threshold
+    ORDER BY similarity DESC
+    LIMIT :limit
+""").bindparams(
+    bindparam("embedding", type_=Vector(1536))
+)
+
+# Coarse pass on the 256-d Matryoshka prefix (embedding_short), then exact
+# re-ranking of the candidates with the full 1536-d embedding
+MATRYOSHKA_SIMILARITY_QUERY = text("""
+    WITH candidates AS (
+        SELECT id, title, description, vote_count, embedding
+        FROM suggestions
+        WHERE embedding_short IS NOT NULL
+        ORDER BY embedding_short <=> CAST(:embedding_short AS vector(256))
+        LIMIT :candidates
+    )
+    SELECT id, title, description, vote_count,
+           1 - (embedding <=> CAST(:embedding AS vector)) as similarity
+    FROM candidates
+    WHERE 1 - (embedding <=> CAST(:embedding AS vector)) > :threshold
+    ORDER BY similarity DESC
+    LIMIT :limit
+""").bindparams(
+    bindparam("embedding", type_=Vector(1536)),
+    bindparam("embedding_short", type_=Vector(SHORT_EMBEDDING_DIMENSIONS))
+)
+
+# VECTOR_CANDIDATE_MODE -> query
+SIMILARITY_QUERIES = {
+    "full": SIMILARITY_QUERY,
+    "halfvec": HALFVEC_SIMILARITY_QUERY,
+    "binary": BINARY_SIMILARITY_QUERY,
+    "matryoshka": MATRYOSHKA_SIMILARITY_QUERY
+}
+
+
+def shorten_embedding(embedding: List[float], dimensions: int = SHORT_EMBEDDING_DIMENSIONS) -> List[float]:
+    """
+    Matryoshka-shorten an embedding: keep its first dimensions and re-normalize
+    
+    text-embedding-3 models are trained so that prefixes stay meaningful;
+    this equals requesting the embedding with the API's "dimensions" option,
+    without a second API call.
+    
+    Args:
+        embedding: Full embedding vector
+        dimensions: Length of the prefix to keep
+        
+    Returns:
+        Unit-length vector of the given dimensions
+    """
+    prefix = np.asarray(embedding[:dimensions], dtype=np.float32)
+    norm = np.linalg.norm(prefix)
+    if norm > 0:
+        prefix = prefix / norm
+    return prefix.tolist()
+
+
+def short_embedding_values(embedding: List[float]) -> dict:
+    """
+    embedding_short column value for a new suggestion, if it is used
+    
+    The column is only written when VECTOR_CANDIDATE_MODE = "matryoshka",
+    so databases created before it existed keep working in the other
+    modes (scripts/quantize_embeddings.py matryoshka adds and backfills it).
+    
+    Returns:
+        {"embedding_short": ...} or an empty dict
+    """
+    if settings.VECTOR_CANDIDATE_MODE != "matryoshka":
+        return {}
+    return {"embedding_short": shorten_embedding(embedding)}
+
+
+# Per-transaction ANN search knobs (is_local = true): more ivfflat probes /
+# a larger HNSW candidate list raise recall at the cost of speed
+SET_SEARCH_PARAMS = text("""
+    SELECT set_config('ivfflat.probes', :probes, true),
+           set_config('hnsw.ef_search', :ef_search, true)
+""")
+
+
+# pgvector >= 0.8: keep scanning the index until LIMIT rows pass any filter
+# instead of stopping after ef_search / the probed lists
+SET_ITERATIVE_SCAN = text("""
+    SELECT set_config('ivfflat.iterative_scan', :iterative_scan, true),
+           set_config('hnsw.iterative_scan', :iterative_scan, true)
+""")
+
+
+def _search_setup(profile: str, limit: int, mode: Optional[str] = None) -> List[tuple]:
+    """
+    Statements (with parameters) to run before a pgvector similarity query
+    
+    Args:
+        profile: "fast" or "recall", see _search_params
+        limit: Number of results the following query asks for
+        mode: VECTOR_CANDIDATE_MODE of the query (default: the configured one)
+    """
+    statements = [(SET_SEARCH_PARAMS, _search_params(profile, limit, mode))]
+    # Older pgvector versions reject the iterative_scan settings
+    if settings.VECTOR_ITERATIVE_SCAN != "off":
+        statements.append((SET_ITERATIVE_SCAN, {"iterative_scan": settings.VECTOR_ITERATIVE_SCAN}))
+    return statements
+
+
+def _search_params(profile: str, limit: int, mode: Optional[str] = None) -> dict:
+    """
+    Bind parameters for SET_SEARCH_PARAMS
+    
+    Args:
+        profile: "fast" (check-similarity while typing) or "recall"
+            (duplicate checks, where a missed match costs more than latency)
+        limit: Number of results the following query asks for
+        mode: VECTOR_CANDIDATE_MODE of the query (default: the configured one)
+    """
+    if profile == "fast":
+        probes, ef_search = settings.VECTOR_PROBES_FAST, settings.VECTOR_EF_SEARCH_FAST
+    else:
+        probes, ef_search = settings.VECTOR_PROBES_RECALL, settings.VECTOR_EF_SEARCH_RECALL
+    
+    # HNSW returns at most ef_search rows, so it must cover the candidates
+    return {"probes": str(probes), "ef_search": str(max(ef_search, _candidate_count(limit, mode)))}
+
+
+def _candidate_count(limit: int, mode: Optional[str] = None) -> int:
+    """Rows the index scan must return: the results, or the candidates a rerank mode re-scores"""
+    if (mode or settings.VECTOR_CANDIDATE_MODE) == "full":
+        return limit
+    return max(limit, settings.VECTOR_RERANK_CANDIDATES)
+
+
+def _similarity_query():
+    """The pgvector similarity query for the configured VECTOR_CANDIDATE_MODE"""
+    try:
+        return SIMILARITY_QUERIES[settings.VECTOR_CANDIDATE_MODE]
+    except KeyError:
+        raise ValueError(
+            f"Unknown VECTOR_CANDIDATE_MODE {settings.VECTOR_CANDIDATE_MODE!r}, "
+            f"expected one of: {', '.join(SIMILARITY_QUERIES)}"
+        )
+
+
+def _similarity_params(
+    new_embedding: List[float],
+    threshold: float,
+    limit: int,
+    mode: Optional[str] = None
+) -> dict:
+    """Bind parameters for the similarity query of a mode (default: VECTOR_CANDIDATE_MODE)"""
+    # Vector-typed bind parameters: sent as binary float32 on asyncpg
+    params = {
+        "embedding": new_embedding,
+        "threshold": threshold,
+        "limit": limit,
+        # Candidates re-ranked exactly (ignored by the "full" query)
+        "candidates": _candidate_count(limit, mode)
+    }
+    if (mode or settings.VECTOR_CANDIDATE_MODE) == "matryoshka":
+        params["embedding_short"] = shorten_embedding(new_embedding)
+    return params
+
+
+def _similarity_results(rows) -> List[dict]:
+    """Convert similarity query rows to response dictionaries"""
+    return [
+        {
+            "id": str(row[0]),
+            "title": row[1],
+            "description": row[2],
+            "vote_count": row[3],
+            "similarity": float(row[4])
+        }
+        for row in rows
+    ]
+
+
+def get_vector_index():
+    """
+    The vector index answering similarity search, if any
+    
+    Returns:
+        The in-process index ("memory") or the shared memory-mapped store
+        ("shared") once loaded, otherwise None (search falls back to pgvector)
+    """
+    if settings.VECTOR_SEARCH_BACKEND == "memory":
+        index = vector_index
+    elif settings.VECTOR_SEARCH_BACKEND == "shared":
+        index = shared_vector_store
+    else:
+        return None
+    return index if index.loaded else None
+
+
+def _hydrate_query(hits: List[tuple]):
+    """Fetch card fields for index hits by primary key"""
+    from database.models import Suggestion
+    
+    return select(
+        Suggestion.id, Suggestion.title, Suggestion.description, Suggestion.vote_count
+    ).where(Suggestion.id.in_([uuid.UUID(suggestion_id) for suggestion_id, _ in hits]))
+
+
+def _hydrated_results(hits: List[tuple], rows) -> List[dict]:
+    """Combine index hits with their card fields, keeping the index order"""
+    by_id = {str(row[0]): row for row in rows}
+    return _similarity_results(
+        (*by_id[suggestion_id], similarity)
+        for suggestion_id, similarity in hits
+        # A suggestion may have been deleted since it was indexed
+        if suggestion_id in by_id
+    )
+
+
+async def afetch_scored_suggestions(db, hits: List[tuple]) -> List[dict]:
+    """
+    Load suggestion cards for (suggestion id, score) hits from an index
+    
+    Args:
+        db: Async database session
+        hits: (suggestion id, score) pairs, best first
+        
+    Returns:
+        List of suggestions in the same format as find_similar_suggestions,
+        with the score as "similarity"
+    """
+    if not hits:
+        return []
+    result = await db.execute(_hydrate_query(hits))
+    return _hydrated_results(hits, result.fetchall())
+
+
 def find_similar_suggestions(
     db,
     new_embedding: List[float],
     threshold: float = 0.85,
-    limit: int = 3
+    limit: int = 3,
+    profile: str = "recall"
 ) -> List[dict]:
     """
     Find suggestions similar to the new embedding using PostgreSQL pgvector
+    (or an exact vector index when VECTOR_SEARCH_BACKEND is "memory" or "shared")
     
     Args:
         db: Database session
         new_embedding: Embedding vector of the new suggestion
         threshold: Minimum similarity threshold (0-1)
         limit: Maximum number of results to return
+        profile: pgvector search profile, "fast" or "recall"
         
     Returns:
         List of similar suggestions with their similarity scores
     """
-    from database.models import Suggestion
-    from sqlalchemy import text
+    index = get_vector_index()
+    if index is not None:
+        hits = index.search(new_embedding, threshold, limit)
+        if not hits:
+            return []
+        return _hydrated_results(hits, db.execute(_hydrate_query(hits)).fetchall())
     
-    # Convert embedding to string format for PostgreSQL
-    embedding_str = "[" + ",".join(map(str, new_embedding)) + "]"
+    for statement, params in _search_setup(profile, limit):
+        db.execute(statement, params)
+    rows = db.execute(
+        _similarity_query(),
+        _similarity_params(new_embedding, threshold, limit)
+    ).fetchall()
     
-    # Query using pgvector's cosine distance operator (<=>)
-    # Note: 1 - distance = similarity
-    # Use proper parameter binding for SQLAlchemy
-    query = text("""
-        SELECT id, title, description, vote_count,
-               1 - (embedding <=> CAST(:embedding AS vector)) as similarity
-        FROM suggestions
-        WHERE 1 - (embedding <=> CAST(:embedding AS vector)) > :threshold
-        ORDER BY similarity DESC
-        LIMIT :limit
-    """)
+    return _similarity_results(rows)
+
+
+async def afind_similar_suggestions(
+    db,
+    new_embedding: List[float],
+    threshold: float = 0.85,
+    limit: int = 3,
+    profile: str = "recall"
+) -> List[dict]:
+    """
+    Async variant of find_similar_suggestions for an AsyncSession
     
-    results = db.execute(
-        query,
-        {
-            "embedding": embedding_str,
-            "threshold": threshold,
-            "limit": limit
-        }
-    ).fetchall()
+    Args:
+        db: Async database session
+        new_embedding: Embedding vector of the new suggestion
+        threshold: Minimum similarity threshold (0-1)
+        limit: Maximum number of results to return
+        profile: pgvector search profile, "fast" or "recall"
+        
+    Returns:
+        List of similar suggestions with their similarity scores
+    """
+    index = get_vector_index()
+    if index is not None:
+        hits = await index.asearch(new_embedding, threshold, limit)
+        return await afetch_scored_suggestions(db, hits)
     
-    return [
-        {
-            "id": str(row[0]),
-            "title": row[1],
-            "description": row[2],
-            "vote_count": row[3],
-            "similarity": float(row[4])
-        }
-        for row in results
-    ]
+    for statement, params in _search_setup(profile, limit):
+        await db.execute(statement, params)
+    result = await db.execute(
+        _similarity_query(),
+        _similarity_params(new_embedding, threshold, limit)
+    )
+    
+    return _similarity_results(result.fetchall())
@@ -0,0 +1,225 @@
+"""
+Title Autocomplete
+In-process character-trigram index over suggestion titles, used to answer
+short check-similarity queries without an embedding call
+"""
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+
+logger = logging.getLogger(__name__)
+
+# Bonus added when the query is a prefix of the title or of one of its words
+PREFIX_BONUS = 0.25
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Character trigrams of each word, padded like pg_trgm
+
+    "Food" -> {"  f", " fo", "foo", "ood", "od "}
+    """
+    grams = set()
+    for word in _normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TitleIndex:
+    """
+    Trigram inverted index: trigram -> ids of titles containing it
+
+    A query's score for a title is the fraction of the query's trigrams
+    found in the title, plus PREFIX_BONUS when the query starts the title
+    or one of its words. Scores are capped at 1.0.
+    """
+
+    def __init__(self):
+        self._titles: Dict[str, str] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+        self.loaded = False
+        self.synced_until: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def load(self, rows) -> None:
+        """Replace the index contents with (suggestion id, title) pairs"""
+        titles = {}
+        postings = defaultdict(set)
+        for suggestion_id, title in rows:
+            key = str(suggestion_id)
+            titles[key] = _normalize(title)
+            for gram in trigrams(title):
+                postings[gram].add(key)
+
+        with self._lock:
+            self._titles = titles
+            self._postings = postings
+            self.loaded = True
+
+    def add(self, suggestion_id, title: str) -> None:
+        """Insert or replace the title for a suggestion"""
+        self.remove(suggestion_id)
+        key = str(suggestion_id)
+        with self._lock:
+            self._titles[key] = _normalize(title)
+            for gram in trigrams(title):
+                self._postings[gram].add(key)
+
+    def remove(self, suggestion_id) -> bool:
+        """
+        Remove a suggestion from the index
+
+        Returns:
+            True if the suggestion was indexed
+        """
+        key = str(suggestion_id)
+        with self._lock:
+            title = self._titles.pop(key, None)
+            if title is None:
+                return False
+            for gram in trigrams(title):
+                ids = self._postings.get(gram)
+                if ids is not None:
+                    ids.discard(key)
+                    if not ids:
+                        del self._postings[gram]
+            return True
+
+    def ids(self) -> Set[str]:
+        """Ids of the indexed suggestions"""
+        with self._lock:
+            return set(self._titles)
+
+    def search(self, query: str, limit: int, min_score: float) -> List[Tuple[str, float]]:
+        """
+        Find titles matching a (partial) query
+
+        Args:
+            query: Text typed so far
+            limit: Maximum number of results
+            min_score: Minimum score (0-1)
+
+        Returns:
+            (suggestion id, score) pairs, best first
+        """
+        grams = trigrams(query)
+        if not grams or limit <= 0:
+            return []
+        normalized = _normalize(query)
+
+        with self._lock:
+            counts: Dict[str, int] = defaultdict(int)
+            for gram in grams:
+                for key in self._postings.get(gram, ()):
+                    counts[key] += 1
+
+            scored = []
+            for key, shared in counts.items():
+                score = shared / len(grams)
+                title = self._titles[key]
+                if title.startswith(normalized) or f" {normalized}" in title:
+                    score += PREFIX_BONUS
+                score = min(score, 1.0)
+                if score >= min_score:
+                    scored.append((key, score, len(title)))
+
+        # Best score first; shorter titles first among equals
+        scored.sort(key=lambda item: (-item[1], item[2]))
+        return [(key, score) for key, score, _ in scored[:limit]]
+
+    # ==================== Database sync ====================
+
+    async def aload(self, db) -> None:
+        """
+        Load every suggestion title from the database
+
+        Args:
+            db: Async database session
+        """
+        from database.models import Suggestion
+
+        result = await db.execute(select(Suggestion.id, Suggestion.title, Suggestion.created_at))
+        rows = result.all()
+
+        self.load((suggestion_id, title) for suggestion_id, title, _ in rows)
+        self.synced_until = max((row[2] for row in rows if row[2] is not None), default=None)
+        logger.info("Title index loaded with %d suggestions", len(self))
+
+    async def sync_new_rows(self, db) -> int:
+        """
+        Pick up suggestions created since the last sync (e.g. by other workers)
+
+        Rows committed after the watermark passed their created_at are
+        picked up by reconcile().
+
+        Args:
+            db: Async database session
+
+        Returns:
+            Number of rows added or replaced
+        """
+        from database.models import Suggestion
+
+        query = select(Suggestion.id, Suggestion.title, Suggestion.created_at)
+        if self.synced_until is not None:
+            query = query.where(Suggestion.created_at >= self.synced_until)
+
+        result = await db.execute(query)
+        added = 0
+        for suggestion_id, title, created_at in result:
+            self.add(suggestion_id, title)
+            added += 1
+            if created_at is not None and (self.synced_until is None or created_at > self.synced_until):
+                self.synced_until = created_at
+        return added
+
+    async def reconcile(self, db) -> Tuple[int, int]:
+        """
+        Make the index match the table: add missing or retitled rows, drop deleted ones
+
+        Args:
+            db: Async database session
+
+        Returns:
+            (rows added or replaced, rows removed)
+        """
+        from database.models import Suggestion
+
+        # Snapshot first, so titles added during the query are not dropped
+        indexed = self.ids()
+        result = await db.execute(select(Suggestion.id, Suggestion.title))
+        current = {str(suggestion_id): title for suggestion_id, title in result}
+
+        with self._lock:
+            changed = [
+                (key, title) for key, title in current.items()
+                if self._titles.get(key) != _normalize(title)
+            ]
+        stale = indexed - current.keys()
+
+        for key, title in changed:
+            self.add(key, title)
+        for key in stale:
+            self.remove(key)
+
+        if changed or stale:
+            logger.info("Title index reconciled: %d added, %d removed", len(changed), len(stale))
+        return len(changed), len(stale)
+
+
+# Global title index instance
+title_index = TitleIndex()
@@ -0,0 +1,131 @@
+"""
+Bulk Import Parsing
+Streaming CSV / JSONL readers for suggestion imports
+"""
+import asyncio
+import codecs
+import csv
+import json
+from itertools import islice
+from typing import AsyncIterator, BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+# Same limit as the suggestions.title column
+MAX_TITLE_LENGTH = 200
+
+# (1-based row number, {"title", "description"} or None, error message or None)
+ImportRow = Tuple[int, Optional[dict], Optional[str]]
+
+
+class ImportFileError(ValueError):
+    """Raised when the rest of an upload cannot be parsed; callers should answer 400"""
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """
+    Guess the import format of an upload
+
+    Returns:
+        "csv", "jsonl", or None if it cannot be told
+    """
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "jsonl"
+    return None
+
+
+def iter_import_rows(file: BinaryIO, fmt: str) -> Iterator[ImportRow]:
+    """
+    Parse an upload one row at a time, without reading it all into memory
+
+    CSV files need a header row with a "title" column and optionally a
+    "description" column; JSONL files hold one object per line with the
+    same keys. Rows that cannot be used are yielded with an error message.
+
+    Args:
+        file: Binary file object positioned at the start
+        fmt: "csv" or "jsonl"
+
+    Raises:
+        ImportFileError: A CSV file is not UTF-8 or is malformed (a quoted
+            field can span lines, so parsing cannot resume after the error)
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(codecs.iterdecode(file, "utf-8-sig"))
+        row_number = 0
+        try:
+            for record in reader:
+                row_number += 1
+                yield _validated(row_number, record)
+        except UnicodeDecodeError:
+            raise ImportFileError(f"Row {row_number + 1}: the file is not valid UTF-8")
+        except csv.Error as e:
+            raise ImportFileError(f"Row {row_number + 1}: {e}")
+        return
+
+    # JSONL lines are decoded one by one, so a bad line only fails its row
+    row_number = 0
+    for raw_line in file:
+        try:
+            line = raw_line.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            row_number += 1
+            yield row_number, None, "Not valid UTF-8"
+            continue
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Expected a JSON object"
+            continue
+        yield _validated(row_number, record)
+
+
+def chunked(rows: Iterable, size: int) -> Iterator[List]:
+    """Split an iterable into lists of at most size items"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def achunked(rows: Iterable, size: int) -> AsyncIterator[List]:
+    """chunked(), reading and parsing each chunk in a worker thread"""
+    chunks = chunked(rows, size)
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def _validated(row_number: int, record: dict) -> ImportRow:
+    title = record.get("title")
+    description = record.get("description")
+
+    if not isinstance(title, str) or not title.strip():
+        return row_number, None, "Missing title"
+    title = title.strip()
+    if len(title) > MAX_TITLE_LENGTH:
+        return row_number, None, f"Title longer than {MAX_TITLE_LENGTH} characters"
+
+    if description is not None and not isinstance(description, str):
+        return row_number, None, "Description must be text"
+    description = (description or "").strip() or None
+
+    # PostgreSQL text cannot hold NUL characters
+    if "\x00" in title or (description and "\x00" in description):
+        return row_number, None, "Text contains a NUL character"
+
+    return row_number, {"title": title, "description": description}, None
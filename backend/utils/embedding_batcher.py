@@ -0,0 +1,99 @@
+"""
+Embedding Batcher
+Coalesces concurrent embedding requests into one Azure OpenAI call
+"""
+import asyncio
+from typing import Awaitable, Callable, List, Tuple
+
+
+class AsyncEmbeddingBatcher:
+    """
+    Micro-batching coalescer for embedding requests
+
+    Coroutines awaiting embed() within window_ms of each other (up to
+    max_batch_size texts) share one awaited API call with a list input, and
+    each gets its own vector. Identical texts in the same batch are embedded
+    once. No thread is involved: the window is a loop timer.
+
+    Only the async request path batches: a blocking caller holds its thread
+    (or event loop) while it waits, so it would only add the window latency.
+    """
+
+    def __init__(
+        self,
+        embed_many: Callable[[List[str]], Awaitable[List[List[float]]]],
+        window_ms: int = 10,
+        max_batch_size: int = 64
+    ):
+        """
+        Args:
+            embed_many: Coroutine function embedding a list of texts in one API call
+            window_ms: How long to wait for more texts after the first arrives
+            max_batch_size: Maximum number of distinct texts per API call
+        """
+        self.embed_many = embed_many
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer = None
+        self._tasks = set()
+
+        # Counters
+        self.batches = 0
+        self.texts = 0
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed one text, sharing the API call with concurrent coroutines"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def stats(self) -> dict:
+        """Batch counters for monitoring"""
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": self.texts / self.batches if self.batches else 0.0,
+            "pending": len(self._pending)
+        }
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            # Keep a reference so the task is not garbage collected mid-flight
+            task = asyncio.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        # Embed each distinct text once
+        texts = list(dict.fromkeys(text for text, _ in batch))
+
+        try:
+            vectors = await self.embed_many(texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(texts, vectors))
+        for text, future in batch:
+            # A caller may have been cancelled (e.g. client disconnected)
+            if not future.done():
+                future.set_result(by_text[text])
+
+        self.batches += 1
+        self.texts += len(texts)
@@ -0,0 +1,285 @@
+"""
+Embedding Cache
+Content-addressed cache in front of Azure OpenAI embeddings:
+a bounded in-process LRU tier backed by a persistent PostgreSQL table
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import numpy as np
+
+from core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Purge expired rows from the persistent tier after this many writes
+PURGE_EVERY_WRITES = 1000
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text before embedding/caching
+
+    Collapses runs of whitespace and strips the ends, so that inputs such as
+    "Title " and "Title" share one cache entry.
+    """
+    return " ".join(text.split())
+
+
+def make_cache_key(text: str, model: str, api_version: str) -> str:
+    """
+    Build the content-addressed cache key for a text
+
+    Args:
+        text: Text to embed (normalized by the caller)
+        model: Embedding model / deployment name
+        api_version: Azure OpenAI API version
+
+    Returns:
+        SHA-256 hex digest of (model, API version, text)
+    """
+    payload = "\x1f".join([model, api_version, text])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache
+
+    - Memory tier: LRU of float32 arrays, bounded by max_entries
+    - Persistent tier: the embedding_cache table, shared by all workers
+
+    Both tiers expire entries after ttl_seconds. Lookups and writes in the
+    persistent tier never raise: a database problem degrades to a cache miss.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, persistent: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        # Counters
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key_for(self, text: str) -> str:
+        """Cache key for already-normalized text under the configured model"""
+        return make_cache_key(
+            text,
+            settings.AZURE_OPENAI_EMBEDDING_MODEL,
+            settings.AZURE_OPENAI_API_VERSION
+        )
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """
+        Look up an embedding, first in memory and then in PostgreSQL
+
+        Returns:
+            The cached embedding, or None on a miss
+        """
+        vector = self._get_memory(key)
+        if vector is not None:
+            return vector.tolist()
+
+        if self.persistent:
+            vector = self._get_persistent(key)
+            if vector is not None:
+                with self._lock:
+                    self.persistent_hits += 1
+                self._set_memory(key, vector)
+                return vector.tolist()
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def aget(self, key: str) -> Optional[List[float]]:
+        """
+        Async variant of get()
+
+        Memory hits return immediately; the PostgreSQL lookup runs in a
+        worker thread so it never blocks the event loop.
+        """
+        vector = self._get_memory(key)
+        if vector is not None:
+            return vector.tolist()
+
+        if self.persistent:
+            vector = await asyncio.to_thread(self._get_persistent, key)
+            if vector is not None:
+                with self._lock:
+                    self.persistent_hits += 1
+                self._set_memory(key, vector)
+                return vector.tolist()
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, embedding: List[float]) -> None:
+        """Store an embedding in both tiers"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        self._set_memory(key, vector)
+        if self.persistent:
+            self._set_persistent(key, vector)
+
+    def aset(self, key: str, embedding: List[float]) -> None:
+        """
+        Store an embedding from async code
+
+        The memory tier is updated immediately; the PostgreSQL write is
+        handed to the default executor and not awaited (it never raises).
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        self._set_memory(key, vector)
+        if self.persistent:
+            asyncio.get_running_loop().run_in_executor(None, self._set_persistent, key, vector)
+
+    def clear(self) -> None:
+        """Drop the memory tier (the persistent tier is left untouched)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.memory_hits + self.persistent_hits + self.misses
+            hits = self.memory_hits + self.persistent_hits
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
+
+    # ==================== Memory tier ====================
+
+    def _get_memory(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            vector, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return vector
+
+    def _set_memory(self, key: str, vector: np.ndarray) -> None:
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (vector, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # ==================== Persistent tier ====================
+
+    def _get_persistent(self, key: str) -> Optional[np.ndarray]:
+        from database.connection import SessionLocal
+        from database.models import EmbeddingCacheEntry
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+        db = SessionLocal()
+        try:
+            row = db.query(EmbeddingCacheEntry.embedding).filter(
+                EmbeddingCacheEntry.key == key,
+                EmbeddingCacheEntry.created_at > cutoff
+            ).first()
+            return np.asarray(row[0], dtype=np.float32) if row else None
+        except Exception as e:
+            logger.warning("Embedding cache lookup failed: %s", e)
+            return None
+        finally:
+            db.close()
+
+    def _set_persistent(self, key: str, vector: np.ndarray) -> None:
+        from database.connection import SessionLocal
+        from sqlalchemy.dialects.postgresql import insert
+        from database.models import EmbeddingCacheEntry
+
+        db = SessionLocal()
+        try:
+            # Upsert so a refreshed entry restarts its TTL
+            statement = insert(EmbeddingCacheEntry).values(
+                key=key,
+                model=settings.AZURE_OPENAI_EMBEDDING_MODEL,
+                embedding=vector.tolist(),
+                created_at=datetime.now(timezone.utc)
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[EmbeddingCacheEntry.key],
+                set_={
+                    "embedding": statement.excluded.embedding,
+                    "created_at": statement.excluded.created_at
+                }
+            )
+            db.execute(statement)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("Embedding cache write failed: %s", e)
+        finally:
+            db.close()
+
+        with self._lock:
+            self._writes += 1
+            purge_due = self._writes % PURGE_EVERY_WRITES == 0
+        if purge_due:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired rows from the persistent tier
+
+        Returns:
+            Number of rows deleted
+        """
+        from database.connection import SessionLocal
+        from database.models import EmbeddingCacheEntry
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+        db = SessionLocal()
+        try:
+            deleted = db.query(EmbeddingCacheEntry).filter(
+                EmbeddingCacheEntry.created_at <= cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        except Exception as e:
+            db.rollback()
+            logger.warning("Embedding cache purge failed: %s", e)
+            return 0
+        finally:
+            db.close()
+
+
+# Global cache instance
+embedding_cache = EmbeddingCache(
+    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS,
+    persistent=settings.EMBEDDING_CACHE_PERSISTENT
+)
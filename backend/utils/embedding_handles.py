@@ -0,0 +1,127 @@
+"""
+Embedding Handles
+Short-lived signed handles for embeddings computed by check-duplicate, so the
+create request that follows can reuse the embedding instead of computing it again
+"""
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+
+from core.config import settings
+
+
+# "<id>.<signature>": token_urlsafe(16) id and base64 of an 18-byte HMAC
+HANDLE_PATTERN = r"^[A-Za-z0-9_-]{22}\.[A-Za-z0-9_-]{24}$"
+HANDLE_MAX_LENGTH = 47
+
+
+class EmbeddingHandleStore:
+    """
+    LRU of embeddings keyed by handle, with a TTL
+
+    A handle is "<id>.<signature>", where the signature is an HMAC of the id,
+    the user and the text the embedding was computed for. It is only
+    redeemed by the same user for the same (normalized) text, and only once.
+    Entries live in this worker's memory: a create request served by another
+    worker finds no entry and computes the embedding as usual.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, secret: str):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._secret = secret.encode("utf-8")
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.issued = 0
+        self.redeemed = 0
+        self.rejected = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def issue(self, user_id: uuid.UUID, text: str, embedding: List[float]) -> str:
+        """
+        Store an embedding and return its handle
+
+        Args:
+            user_id: User the handle is issued to
+            text: Normalized text the embedding was computed for
+            embedding: The embedding vector
+        """
+        handle_id = secrets.token_urlsafe(16)
+        text_hash = _text_hash(text)
+        with self._lock:
+            self._entries[handle_id] = (user_id, text_hash, embedding, time.monotonic())
+            self._entries.move_to_end(handle_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self.issued += 1
+        return f"{handle_id}.{self._sign(handle_id, user_id, text_hash)}"
+
+    def redeem(self, handle: str, user_id: uuid.UUID, text: str) -> Optional[List[float]]:
+        """
+        Take the embedding of a handle
+
+        Args:
+            handle: Handle returned by issue()
+            user_id: User redeeming the handle
+            text: Normalized text of the request
+
+        Returns:
+            The embedding, or None if the handle is invalid, expired, unknown
+            to this worker or was issued for another user or text
+        """
+        handle_id, _, signature = handle.partition(".")
+        text_hash = _text_hash(text)
+        # Compare bytes: compare_digest() rejects non-ASCII str with TypeError
+        expected = self._sign(handle_id, user_id, text_hash).encode("ascii")
+        if not hmac.compare_digest(signature.encode("utf-8"), expected):
+            with self._lock:
+                self.rejected += 1
+            return None
+
+        with self._lock:
+            entry = self._entries.pop(handle_id, None)
+            if entry is None or time.monotonic() - entry[3] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self.redeemed += 1
+            return entry[2]
+
+    def stats(self) -> dict:
+        """Store counters for monitoring"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "issued": self.issued,
+                "redeemed": self.redeemed,
+                "rejected": self.rejected,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _sign(self, handle_id: str, user_id: uuid.UUID, text_hash: str) -> str:
+        message = f"{handle_id}:{user_id}:{text_hash}".encode("utf-8")
+        digest = hmac.new(self._secret, message, hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest[:18]).decode("ascii")
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Global embedding handle store instance
+embedding_handles = EmbeddingHandleStore(
+    max_entries=settings.EMBEDDING_HANDLE_MAX_ENTRIES,
+    ttl_seconds=settings.EMBEDDING_HANDLE_TTL_SECONDS,
+    secret=settings.SECRET_KEY
+)
@@ -0,0 +1,114 @@
+"""
+Data Export
+Streams suggestions and votes as NDJSON or CSV from a server-side cursor,
+so memory stays flat regardless of table size
+"""
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, Dict, List
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+
+from database.connection import AsyncSessionLocal
+from database.models import Suggestion, Vote
+
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# Rows fetched from the cursor (and encoded) per chunk
+EXPORT_BATCH_ROWS = 1000
+
+# Columns each dataset offers, in default output order
+EXPORT_COLUMNS: Dict[str, dict] = {
+    "suggestions": {
+        "id": Suggestion.id,
+        "user_id": Suggestion.user_id,
+        "title": Suggestion.title,
+        "description": Suggestion.description,
+        "vote_count": Suggestion.vote_count,
+        "status": Suggestion.status,
+        "created_at": Suggestion.created_at,
+    },
+    "vote-counts": {
+        "suggestion_id": Suggestion.id,
+        "title": Suggestion.title,
+        "vote_count": Suggestion.vote_count,
+        "votes": func.count(Vote.user_id),  # Counted from the votes table
+    },
+    "votes": {
+        "user_id": Vote.user_id,
+        "suggestion_id": Vote.suggestion_id,
+        "voted_at": Vote.voted_at,
+    },
+}
+
+
+def export_query(dataset: str, columns: List[str]) -> Select:
+    """
+    Build the SELECT for an export
+
+    Args:
+        dataset: Key of EXPORT_COLUMNS
+        columns: Column names to output (validated by the caller)
+    """
+    available = EXPORT_COLUMNS[dataset]
+    query = select(*[available[column].label(column) for column in columns])
+
+    if dataset == "suggestions":
+        return query.order_by(Suggestion.created_at, Suggestion.id)
+    if dataset == "vote-counts":
+        return (
+            query.select_from(Suggestion)
+            .outerjoin(Vote, Vote.suggestion_id == Suggestion.id)
+            .group_by(Suggestion.id)
+            .order_by(Suggestion.vote_count.desc(), Suggestion.id)
+        )
+    return query.order_by(Vote.voted_at, Vote.user_id, Vote.suggestion_id)
+
+
+async def stream_export(query: Select, columns: List[str], fmt: str) -> AsyncIterator[bytes]:
+    """
+    Encode the rows of a query chunk by chunk
+
+    Opens its own session: a StreamingResponse body runs after request
+    dependencies (and their sessions) have been torn down.
+
+    Args:
+        query: Query from export_query()
+        columns: Output column names, in order
+        fmt: "ndjson" or "csv"
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_ROWS))
+
+        if fmt == "csv":
+            yield _csv_lines([columns])
+
+        async for rows in result.partitions():
+            if fmt == "csv":
+                yield _csv_lines([[_csv_value(value) for value in row] for row in rows])
+            else:
+                yield _ndjson_lines(columns, rows)
+
+
+def _ndjson_lines(columns: List[str], rows) -> bytes:
+    # asyncpg returns its own UUID subclass, which orjson does not serialize
+    return b"".join(
+        orjson.dumps(dict(zip(columns, row)), default=str, option=orjson.OPT_APPEND_NEWLINE)
+        for row in rows
+    )
+
+
+def _csv_lines(rows: List[list]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
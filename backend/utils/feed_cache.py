@@ -0,0 +1,213 @@
+"""
+Feed Cache
+Ranked, pre-serialized suggestion cards for the top of the feed, patched
+in place when votes or new suggestions change the ranking
+"""
+import asyncio
+import bisect
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import select
+
+from core.config import settings
+from utils.pagination import FeedKey, feed_order
+from utils.vote_buffer import vote_counter_buffer
+
+
+logger = logging.getLogger(__name__)
+
+
+def suggestion_card(suggestion, vote_count: Optional[int] = None) -> dict:
+    """
+    Serialize a suggestion into the feed card fields of SuggestionResponse
+
+    The per-user user_has_voted flag is left out and added at response time.
+
+    Args:
+        suggestion: Suggestion ORM object or row with the same attributes
+        vote_count: Count to show instead of suggestion.vote_count
+    """
+    return {
+        "id": str(suggestion.id),
+        "user_id": str(suggestion.user_id),
+        "title": suggestion.title,
+        "description": suggestion.description,
+        "vote_count": suggestion.vote_count if vote_count is None else vote_count,
+        "status": suggestion.status,
+        "created_at": str(suggestion.created_at)
+    }
+
+
+class FeedCache:
+    """
+    Top-N feed ranking shared by all users of a worker
+
+    Cards are kept in feed order (vote_count DESC, created_at, id), with a
+    parallel list of sort keys for bisection. Votes cast through this worker
+    patch the affected card and move it to its new rank; new suggestions are
+    inserted at their rank. Changes made by other workers become visible
+    when the cache expires after ttl_seconds.
+    """
+
+    def __init__(self, size: int, ttl_seconds: float):
+        self.size = size
+        self.ttl_seconds = ttl_seconds
+
+        self._cards: List[dict] = []
+        self._keys: List[tuple] = []
+        # True when the table may hold rows beyond the cached ones
+        self._truncated = True
+        self._loaded_at: Optional[float] = None
+        self._refresh_lock = asyncio.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.invalidations = 0
+
+    @property
+    def fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    async def page(
+        self,
+        db,
+        limit: int,
+        after: Optional[FeedKey] = None,
+        skip: int = 0
+    ) -> Optional[List[dict]]:
+        """
+        Cards for one feed page, refreshing the cache if it has expired
+
+        Args:
+            db: Async database session (used only to refresh)
+            limit: Page size
+            after: Decoded cursor; the page starts just after it
+            skip: Number of cards to skip (offset paging, when no cursor)
+
+        Returns:
+            The page's cards, or None if the page lies beyond the cached range
+        """
+        if after is None and skip + limit > self.size:
+            self.misses += 1
+            return None
+
+        if not self.fresh:
+            async with self._refresh_lock:
+                # Another request may have refreshed while we waited
+                if not self.fresh:
+                    await self.refresh(db)
+
+        start = skip
+        if after is not None:
+            vote_count, created_at, suggestion_id = after
+            start = bisect.bisect_right(self._keys, (-vote_count, created_at, suggestion_id))
+
+        if self._truncated and start + limit > len(self._cards):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._cards[start:start + limit]
+
+    async def refresh(self, db) -> None:
+        """Reload the top cards from the database"""
+        from database.models import Suggestion
+
+        result = await db.execute(
+            select(
+                Suggestion.id, Suggestion.user_id, Suggestion.title, Suggestion.description,
+                Suggestion.vote_count, Suggestion.status, Suggestion.created_at
+            )
+            .order_by(*feed_order(Suggestion))
+            .limit(self.size)
+        )
+        rows = result.all()
+
+        self._cards = [
+            suggestion_card(row, vote_counter_buffer.overlay(row.id, row.vote_count))
+            for row in rows
+        ]
+        self._keys = [_sort_key(card, row.created_at) for card, row in zip(self._cards, rows)]
+        self._truncated = len(rows) == self.size
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+
+    def invalidate(self) -> None:
+        """Force a reload on the next read"""
+        self._loaded_at = None
+        self.invalidations += 1
+
+    def apply_vote(self, suggestion_id: str, vote_count: int) -> None:
+        """
+        Patch a card's vote count and move it to its new rank
+
+        Args:
+            suggestion_id: Suggestion whose count changed
+            vote_count: New count as shown to users
+        """
+        if not self.fresh:
+            return
+
+        position = self._position(suggestion_id)
+        if position is None:
+            # Not cached: it matters only if it now outranks the last card
+            if self._truncated and self._cards and vote_count > self._cards[-1]["vote_count"]:
+                self.invalidate()
+            return
+
+        card = {**self._cards.pop(position), "vote_count": vote_count}
+        _, created_at, _ = self._keys.pop(position)
+        self._insert(card, created_at)
+
+    def add_suggestion(self, card: dict, created_at: datetime) -> None:
+        """Insert a newly created suggestion at its rank"""
+        if self.fresh:
+            self._insert(card, created_at)
+
+    def stats(self) -> dict:
+        """Cache counters for monitoring"""
+        return {
+            "cards": len(self._cards),
+            "fresh": self.fresh,
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "invalidations": self.invalidations
+        }
+
+    def _position(self, suggestion_id: str) -> Optional[int]:
+        for position, card in enumerate(self._cards):
+            if card["id"] == suggestion_id:
+                return position
+        return None
+
+    def _insert(self, card: dict, created_at: datetime) -> None:
+        key = _sort_key(card, created_at)
+        position = bisect.bisect_left(self._keys, key)
+
+        if self._truncated and position == len(self._cards):
+            # Uncached rows may rank above it, so its true position is unknown
+            return
+
+        self._cards.insert(position, card)
+        self._keys.insert(position, key)
+        if len(self._cards) > self.size:
+            self._cards.pop()
+            self._keys.pop()
+
+
+def _sort_key(card: dict, created_at: datetime) -> tuple:
+    # Ascending tuple order == feed order; canonical UUID strings sort like PostgreSQL uuids
+    return (-card["vote_count"], created_at, card["id"])
+
+
+# Global feed cache instance
+feed_cache = FeedCache(
+    size=settings.FEED_CACHE_SIZE,
+    ttl_seconds=settings.FEED_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,94 @@
+"""
+Keyset Pagination
+Opaque cursors over the feed ordering (vote_count DESC, created_at ASC, id ASC)
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+FeedKey = Tuple[int, datetime, str]
+
+
+def encode_cursor(vote_count: int, created_at, suggestion_id) -> str:
+    """
+    Build the cursor pointing just after a suggestion
+
+    Args:
+        vote_count: The suggestion's vote count
+        created_at: Its creation time (datetime or ISO string)
+        suggestion_id: Its id
+
+    Returns:
+        URL-safe opaque cursor string
+    """
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    payload = json.dumps([vote_count, str(created_at), str(suggestion_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> FeedKey:
+    """
+    Parse a cursor produced by encode_cursor
+
+    Returns:
+        (vote_count, created_at, suggestion id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        vote_count, created_at, suggestion_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(vote_count), datetime.fromisoformat(created_at), str(uuid.UUID(suggestion_id))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def cursor_for_card(card: dict) -> str:
+    """Cursor pointing just after a serialized feed card"""
+    return encode_cursor(card["vote_count"], card["created_at"], card["id"])
+
+
+def next_cursor(cards: list, limit: int) -> Optional[str]:
+    """Cursor for the page after these cards, or None if this was the last page"""
+    if limit <= 0 or len(cards) < limit:
+        return None
+    return cursor_for_card(cards[-1])
+
+
+def after_cursor(model, key: FeedKey):
+    """
+    SQL condition selecting rows strictly after a cursor in feed order
+
+    The redundant "vote_count <= :vc" bound lets PostgreSQL start an index
+    range scan on idx_suggestions_feed at the cursor position.
+    """
+    vote_count, created_at, suggestion_id = key
+    suggestion_uuid = uuid.UUID(suggestion_id)
+    return and_(
+        model.vote_count <= vote_count,
+        or_(
+            model.vote_count < vote_count,
+            and_(
+                model.vote_count == vote_count,
+                or_(
+                    model.created_at > created_at,
+                    and_(model.created_at == created_at, model.id > suggestion_uuid)
+                )
+            )
+        )
+    )
+
+
+def feed_order(model) -> tuple:
+    """ORDER BY clauses of the feed ordering"""
+    return (model.vote_count.desc(), model.created_at.asc(), model.id.asc())
@@ -0,0 +1,114 @@
+"""
+Password Hashing Pool
+Runs bcrypt hashing and verification on a bounded worker pool so that
+logins never block the event loop
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from core.config import settings
+from utils.security import hash_password, verify_password
+
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Raised when the pool's queue is full; callers should answer 503"""
+
+
+class PasswordHasherPool:
+    """
+    Bounded thread pool for bcrypt
+
+    bcrypt releases the GIL while hashing, so a thread pool uses every core
+    without the cost of a process pool. At most max_queue jobs may wait for
+    a worker; beyond that, calls fail fast with PasswordPoolBusy instead of
+    piling up behind a login storm.
+    """
+
+    def __init__(self, workers: Optional[int], max_queue: int):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._queued = 0  # Submitted and not yet started
+        self._running = 0
+
+        # Counters
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        """Async hash_password()"""
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Async verify_password()"""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self.rejected += 1
+                raise PasswordPoolBusy("Password hashing queue is full")
+            self._queued += 1
+
+        # A job leaves the queue when a worker starts it (_call) or when it
+        # is cancelled before starting; a cancelled caller whose job is
+        # already running does not free a queue slot it never held
+        future = self._executor.submit(self._call, time.monotonic(), fn, *args)
+        future.add_done_callback(self._dequeue_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _dequeue_if_cancelled(self, future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def _call(self, submitted_at: float, fn, *args):
+        wait = time.monotonic() - submitted_at
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self.total_wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.completed += 1
+
+    def shutdown(self) -> None:
+        """Stop the worker threads (waits for running jobs)"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        """Pool counters for monitoring"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queue_depth": self._queued,
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(1000 * self.total_wait_seconds / self.completed, 2) if self.completed else 0.0,
+                "max_wait_ms": round(1000 * self.max_wait_seconds, 2)
+            }
+
+
+# Global password hashing pool
+password_pool = PasswordHasherPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
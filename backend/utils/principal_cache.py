@@ -0,0 +1,112 @@
+"""
+Principal Cache
+Short-lived LRU of authenticated users keyed by user id, so that validating
+a JWT does not need a users-table query on every request
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from core.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by request handlers"""
+    id: uuid.UUID
+    email: str
+    full_name: Optional[str]
+    role: str
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        """Build a principal from a User ORM object"""
+        return cls(id=user.id, email=user.email, full_name=user.full_name, role=user.role)
+
+
+class PrincipalCache:
+    """
+    LRU of principals with a TTL
+
+    An entry is trusted for at most ttl_seconds after it was read from the
+    database. Code that changes a user's role or account (or deletes it)
+    must call invalidate() so this worker stops serving the old principal;
+    other workers pick up the change when their entry expires.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[uuid.UUID, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: uuid.UUID) -> Optional[Principal]:
+        """
+        Look up a principal
+
+        Returns:
+            The cached principal, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            principal, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return principal
+
+    def set(self, principal: Principal) -> None:
+        """Store a principal freshly read from the database"""
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic())
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        """Drop a user's principal after a role or account change"""
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every cached principal"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Cache counters for monitoring"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
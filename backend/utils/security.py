@@ -1,9 +1,11 @@
 """
 Security Utilities
-Handles password hashing and JWT token creation/verification
+Handles password hashing, JWT token creation/verification and refresh tokens
 """
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+import hashlib
+import secrets
 from jose import JWTError, jwt
 import bcrypt
 from core.config import settings
@@ -81,3 +83,30 @@ def verify_token(token: str) -> Optional[dict]:
         return payload
     except JWTError:
         return None
+
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Hash a refresh token for storage and lookup
+    
+    Refresh tokens are 256-bit random values, so a fast hash is enough
+    (unlike passwords, they cannot be brute-forced from the hash).
+    
+    Args:
+        token: Refresh token string
+        
+    Returns:
+        SHA-256 hex digest
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def create_refresh_token() -> Tuple[str, str]:
+    """
+    Generate a new opaque refresh token
+    
+    Returns:
+        (token to give to the client, hash to store in the database)
+    """
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
@@ -0,0 +1,397 @@
+"""
+Shared Vector Store
+Suggestion embedding matrix in a memory-mapped file, shared zero-copy by
+all uvicorn worker processes on a host
+
+File layout (little-endian):
+    [header: 64 bytes]
+    [matrix: capacity x dimensions float32, rows L2-normalized]
+    [ids:    capacity x 16 bytes, suggestion UUIDs]
+
+Rows [0, count) are valid. Deleted rows are tombstoned (zero vector, zero
+id) so row numbers never move. Appends and deletes are serialized with an
+exclusive lock on "<path>.lock" (fcntl.flock, so this backend is POSIX
+only); readers take no lock. Taking the lock can wait on another worker,
+so async code writes through aadd_many() / aremove_many(), which run in a
+thread. Every change bumps the generation counter. When the file is full, the writer copies it into a
+file of twice the capacity, atomically renames it over the old path and
+marks the old mapping superseded, so readers remap on their next query.
+"""
+import asyncio
+import contextlib
+import logging
+import mmap
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: the "shared" backend is unavailable
+    fcntl = None
+from utils.vector_index import EMBEDDING_DIMENSIONS, VectorIndex, _normalize
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VOTEVEC1"
+HEADER_SIZE = 64
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("dimensions", "<u4"),
+    ("reserved", "<u4"),
+    ("capacity", "<u8"),
+    ("count", "<u8"),
+    ("generation", "<u8"),
+    ("superseded", "<u8"),
+    ("synced_until_us", "<i8"),  # Newest created_at copied from the database (epoch µs)
+])
+ID_BYTES = 16
+
+
+class _Mapping:
+    """NumPy views over one mapped store file"""
+
+    def __init__(self, path: str):
+        with open(path, "r+b") as f:
+            self.mm = mmap.mmap(f.fileno(), 0)
+
+        self.header = np.frombuffer(self.mm, dtype=HEADER_DTYPE, count=1)
+        if self.header["magic"][0] != MAGIC:
+            raise ValueError(f"{path} is not a vector store file")
+
+        self.dimensions = int(self.header["dimensions"][0])
+        self.capacity = int(self.header["capacity"][0])
+        self.matrix = np.frombuffer(
+            self.mm, dtype=np.float32, count=self.capacity * self.dimensions, offset=HEADER_SIZE
+        ).reshape(self.capacity, self.dimensions)
+        self.ids = np.frombuffer(
+            self.mm, dtype=np.uint8, count=self.capacity * ID_BYTES,
+            offset=HEADER_SIZE + self.matrix.nbytes
+        ).reshape(self.capacity, ID_BYTES)
+
+    @property
+    def count(self) -> int:
+        return int(self.header["count"][0])
+
+    def find(self, key: bytes) -> Optional[int]:
+        """Row holding a suggestion id, or None"""
+        target = np.frombuffer(key, dtype=np.uint8)
+        rows = np.flatnonzero((self.ids[:self.count] == target).all(axis=1))
+        return int(rows[0]) if len(rows) else None
+
+
+def _create_file(path: str, dimensions: int, capacity: int) -> None:
+    """Write an empty store file of the given capacity"""
+    size = HEADER_SIZE + capacity * dimensions * 4 + capacity * ID_BYTES
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.truncate(size)
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["dimensions"] = dimensions
+        header["capacity"] = capacity
+        f.seek(0)
+        f.write(header.tobytes())
+
+
+class SharedVectorStore(VectorIndex):
+    """
+    Memory-mapped, multi-process variant of VectorIndex
+
+    Exposes the same add/remove/search/load interface (and inherits the
+    database sync helpers), but the data lives in a file mapped by every
+    worker, so memory does not grow with the number of workers.
+    """
+
+    def __init__(self, path: str, dimensions: int = EMBEDDING_DIMENSIONS, initial_capacity: int = 1024):
+        self.path = path
+        self.dimensions = dimensions
+        self.initial_capacity = initial_capacity
+        self._mapping: Optional[_Mapping] = None
+        self._lock = threading.RLock()
+        self._lock_file = None
+        self.loaded = False
+
+    def __len__(self) -> int:
+        mapping = self._current()
+        if mapping is None:
+            return 0
+        return int((mapping.ids[:mapping.count] != 0).any(axis=1).sum())
+
+    # ==================== Opening ====================
+
+    def open(self) -> bool:
+        """
+        Map an existing store file
+
+        Returns:
+            True if a valid file for these dimensions was found
+        """
+        if not os.path.exists(self.path):
+            return False
+        try:
+            mapping = _Mapping(self.path)
+        except (ValueError, OSError) as e:
+            logger.warning("Ignoring vector store file %s: %s", self.path, e)
+            return False
+        if mapping.dimensions != self.dimensions:
+            return False
+
+        self._mapping = mapping
+        self.loaded = True
+        return True
+
+    async def aopen(self, db) -> None:
+        """
+        Map the store file, building it from the database if missing
+
+        Only the first worker to take the file lock builds the file; the
+        others then map what it wrote. The lock is taken in a thread and
+        never held across an await, so the event loop keeps running while
+        another worker builds.
+
+        Args:
+            db: Async database session
+        """
+        if fcntl is None:
+            raise RuntimeError(
+                "VECTOR_SEARCH_BACKEND=shared needs POSIX file locks; use \"memory\" on Windows"
+            )
+        if await asyncio.to_thread(self._open_locked):
+            return
+
+        rows, latest = await self._fetch_all(db)
+        await asyncio.to_thread(self._build_unless_present, rows, latest)
+
+    def _open_locked(self) -> bool:
+        with self._file_lock():
+            return self.open()
+
+    def _build_unless_present(self, rows, latest: Optional[datetime]) -> None:
+        with self._file_lock():
+            # Another worker may have built the file while we were fetching
+            if self.open():
+                return
+            self.load(rows)
+            self.synced_until = latest
+            logger.info("Shared vector store built with %d suggestions", len(self))
+
+    def load(self, rows) -> None:
+        """Rebuild the store file from (suggestion id, embedding) pairs"""
+        rows = [(suggestion_id, embedding) for suggestion_id, embedding in rows if embedding is not None]
+        capacity = max(self.initial_capacity, 2 * len(rows))
+
+        tmp_path = self.path + ".tmp"
+        _create_file(tmp_path, self.dimensions, capacity)
+        mapping = _Mapping(tmp_path)
+        for row, (suggestion_id, embedding) in enumerate(rows):
+            mapping.matrix[row] = _normalize(embedding)
+            mapping.ids[row] = np.frombuffer(_id_bytes(suggestion_id), dtype=np.uint8)
+        mapping.header["count"] = len(rows)
+        mapping.mm.flush()
+
+        with self._file_lock():
+            os.replace(tmp_path, self.path)
+            self._supersede_current()
+            self._mapping = _Mapping(self.path)
+            self.loaded = True
+
+    # ==================== Writes ====================
+
+    def add(self, suggestion_id, embedding) -> None:
+        """Insert or replace the embedding for a suggestion"""
+        key = _id_bytes(suggestion_id)
+        vector = _normalize(embedding)
+
+        with self._file_lock():
+            mapping = self._current()
+            row = mapping.find(key)
+            if row is None:
+                row = mapping.count
+                if row == mapping.capacity:
+                    mapping = self._grow(mapping)
+                mapping.matrix[row] = vector
+                mapping.ids[row] = np.frombuffer(key, dtype=np.uint8)
+                # Publish the row only after it is fully written
+                mapping.header["count"] = row + 1
+            else:
+                mapping.matrix[row] = vector
+            mapping.header["generation"] += 1
+
+    def remove(self, suggestion_id) -> bool:
+        """
+        Tombstone a suggestion
+
+        Returns:
+            True if the suggestion was stored
+        """
+        key = _id_bytes(suggestion_id)
+        with self._file_lock():
+            mapping = self._current()
+            row = mapping.find(key)
+            if row is None:
+                return False
+            mapping.matrix[row] = 0
+            mapping.ids[row] = 0
+            mapping.header["generation"] += 1
+            return True
+
+    def add_many(self, rows) -> int:
+        """add() each (suggestion id, embedding) pair under one file lock"""
+        with self._file_lock():
+            return super().add_many(rows)
+
+    def remove_many(self, suggestion_ids) -> int:
+        """remove() each suggestion under one file lock"""
+        with self._file_lock():
+            return super().remove_many(suggestion_ids)
+
+    def _grow(self, mapping: _Mapping) -> _Mapping:
+        """Copy the store into a file of twice the capacity (lock must be held)"""
+        count = mapping.count
+        tmp_path = self.path + ".tmp"
+        _create_file(tmp_path, self.dimensions, mapping.capacity * 2)
+
+        grown = _Mapping(tmp_path)
+        grown.matrix[:count] = mapping.matrix[:count]
+        grown.ids[:count] = mapping.ids[:count]
+        grown.header["count"] = count
+        grown.header["generation"] = mapping.header["generation"][0] + 1
+        grown.header["synced_until_us"] = mapping.header["synced_until_us"][0]
+        grown.mm.flush()
+
+        os.replace(tmp_path, self.path)
+        self._supersede_current()
+        self._mapping = _Mapping(self.path)
+        return self._mapping
+
+    def _supersede_current(self) -> None:
+        # Tell readers still mapping the old file to remap the new one
+        if self._mapping is not None:
+            self._mapping.header["superseded"] = 1
+            self._mapping.header["generation"] += 1
+
+    # ==================== Reads ====================
+
+    def ids(self) -> Set[str]:
+        """Ids of the stored (not tombstoned) suggestions"""
+        mapping = self._current()
+        if mapping is None:
+            return set()
+        ids = mapping.ids[:mapping.count]
+        return {str(uuid.UUID(bytes=row.tobytes())) for row in ids[(ids != 0).any(axis=1)]}
+
+    def search(
+        self,
+        query: List[float],
+        threshold: float,
+        limit: int
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the most similar suggestions above a threshold
+
+        Args:
+            query: Query embedding (need not be normalized)
+            threshold: Minimum cosine similarity (0-1)
+            limit: Maximum number of results
+
+        Returns:
+            (suggestion id, similarity) pairs, most similar first
+        """
+        mapping = self._current()
+        if mapping is None or limit <= 0:
+            return []
+
+        count = mapping.count
+        if count == 0:
+            return []
+        scores = mapping.matrix[:count] @ _normalize(query)
+
+        # Tombstoned rows are zero vectors and score 0
+        candidates = np.flatnonzero(scores > max(threshold, 0.0))
+        if len(candidates) > limit:
+            top = np.argpartition(scores[candidates], -limit)[-limit:]
+            candidates = candidates[top]
+        order = candidates[np.argsort(-scores[candidates])]
+
+        return [
+            (str(uuid.UUID(bytes=mapping.ids[row].tobytes())), float(scores[row]))
+            for row in order
+        ]
+
+    def stats(self) -> dict:
+        """Store size for monitoring"""
+        mapping = self._current()
+        if mapping is None:
+            return {"loaded": False, "path": self.path}
+        return {
+            "loaded": True,
+            "path": self.path,
+            "rows": mapping.count,
+            "capacity": mapping.capacity,
+            "generation": int(mapping.header["generation"][0]),
+            "mapped_bytes": len(mapping.mm)
+        }
+
+    def _current(self) -> Optional[_Mapping]:
+        """The live mapping, remapping if a writer replaced the file"""
+        mapping = self._mapping
+        if mapping is not None and mapping.header["superseded"][0]:
+            with self._lock:
+                if self._mapping is mapping:
+                    self._mapping = _Mapping(self.path)
+                mapping = self._mapping
+        return mapping
+
+    # ==================== Sync position ====================
+
+    @property
+    def synced_until(self) -> Optional[datetime]:
+        mapping = self._current()
+        if mapping is None or not mapping.header["synced_until_us"][0]:
+            return None
+        micros = int(mapping.header["synced_until_us"][0])
+        return datetime.fromtimestamp(micros / 1_000_000, tz=timezone.utc)
+
+    @synced_until.setter
+    def synced_until(self, value: Optional[datetime]) -> None:
+        mapping = self._current()
+        if mapping is not None and value is not None:
+            mapping.header["synced_until_us"] = int(value.timestamp() * 1_000_000)
+
+    # ==================== Locking ====================
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive cross-process lock (re-entrant within a process)"""
+        with self._lock:
+            if self._lock_file is not None:
+                # Already held by this process
+                yield
+                return
+
+            self._lock_file = open(self.path + ".lock", "a+b")
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                self._lock_file.close()
+                self._lock_file = None
+
+
+def _id_bytes(suggestion_id) -> bytes:
+    if isinstance(suggestion_id, uuid.UUID):
+        return suggestion_id.bytes
+    return uuid.UUID(str(suggestion_id)).bytes
+
+
+# Global store instance (used when VECTOR_SEARCH_BACKEND = "shared")
+shared_vector_store = SharedVectorStore(settings.VECTOR_SHARED_STORE_PATH)
@@ -0,0 +1,346 @@
+"""
+In-Process Vector Index
+Exact cosine-similarity search over suggestion embeddings held in RAM
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = 1536
+
+# Embeddings fetched per query when reconcile() adds missing rows
+RECONCILE_FETCH_ROWS = 500
+
+
+class VectorIndex:
+    """
+    Exact top-k index over L2-normalized embeddings
+
+    Rows live in one contiguous float32 matrix, so a query is a single
+    matrix-vector product followed by a partial sort. Inserts append (the
+    matrix grows by doubling) and deletes swap the last row into the hole,
+    so both are O(dim).
+
+    A query reads the whole matrix (6 KB per row): about 600 MB and tens of
+    milliseconds per 100k suggestions. Async callers use asearch(), which
+    runs it in a thread; beyond ~100k suggestions use the pgvector backend.
+    """
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS, initial_capacity: int = 1024):
+        self.dimensions = dimensions
+        self._matrix = np.zeros((initial_capacity, dimensions), dtype=np.float32)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+        self.loaded = False
+        self.synced_until: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def load(self, rows: Iterable[Tuple[object, object]]) -> None:
+        """
+        Replace the index contents
+
+        Args:
+            rows: (suggestion id, embedding) pairs; rows without an embedding are skipped
+        """
+        ids = []
+        vectors = []
+        for suggestion_id, embedding in rows:
+            if embedding is not None:
+                ids.append(str(suggestion_id))
+                vectors.append(_normalize(embedding))
+
+        # Build outside the lock so searches keep running during a reload
+        capacity = max(1024, len(ids))
+        matrix = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        if vectors:
+            matrix[:len(vectors)] = np.stack(vectors)
+
+        with self._lock:
+            self._matrix = matrix
+            self._ids = ids
+            self._rows = {key: row for row, key in enumerate(ids)}
+            self.loaded = True
+
+    def add(self, suggestion_id, embedding) -> None:
+        """Insert or replace the embedding for a suggestion"""
+        key = str(suggestion_id)
+        vector = _normalize(embedding)
+
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                row = len(self._ids)
+                if row == self._matrix.shape[0]:
+                    self._grow()
+                self._ids.append(key)
+                self._rows[key] = row
+            self._matrix[row] = vector
+
+    def remove(self, suggestion_id) -> bool:
+        """
+        Remove a suggestion from the index
+
+        Returns:
+            True if the suggestion was indexed
+        """
+        key = str(suggestion_id)
+        with self._lock:
+            row = self._rows.pop(key, None)
+            if row is None:
+                return False
+
+            last = len(self._ids) - 1
+            if row != last:
+                # Move the last row into the freed slot
+                moved = self._ids[last]
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+            self._ids.pop()
+            return True
+
+    def add_many(self, rows: Iterable[Tuple[object, object]]) -> int:
+        """
+        add() each (suggestion id, embedding) pair
+
+        Returns:
+            Number of rows added or replaced
+        """
+        added = 0
+        for suggestion_id, embedding in rows:
+            self.add(suggestion_id, embedding)
+            added += 1
+        return added
+
+    def remove_many(self, suggestion_ids: Iterable[object]) -> int:
+        """
+        remove() each suggestion
+
+        Returns:
+            Number of suggestions that were indexed
+        """
+        return sum(1 for suggestion_id in suggestion_ids if self.remove(suggestion_id))
+
+    async def aadd_many(self, rows: Iterable[Tuple[object, object]]) -> int:
+        """add_many() in a worker thread, so writers waiting on the lock do not block the event loop"""
+        return await asyncio.to_thread(self.add_many, list(rows))
+
+    async def aremove_many(self, suggestion_ids: Iterable[object]) -> int:
+        """remove_many() in a worker thread"""
+        return await asyncio.to_thread(self.remove_many, list(suggestion_ids))
+
+    def ids(self) -> Set[str]:
+        """Ids of the indexed suggestions"""
+        with self._lock:
+            return set(self._ids)
+
+    def search(
+        self,
+        query: List[float],
+        threshold: float,
+        limit: int
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the most similar suggestions above a threshold
+
+        Args:
+            query: Query embedding (need not be normalized)
+            threshold: Minimum cosine similarity (0-1)
+            limit: Maximum number of results
+
+        Returns:
+            (suggestion id, similarity) pairs, most similar first
+        """
+        q = _normalize(query)
+
+        with self._lock:
+            count = len(self._ids)
+            if count == 0 or limit <= 0:
+                return []
+            scores = self._matrix[:count] @ q
+
+            candidates = np.flatnonzero(scores > threshold)
+            if len(candidates) > limit:
+                top = np.argpartition(scores[candidates], -limit)[-limit:]
+                candidates = candidates[top]
+            order = candidates[np.argsort(-scores[candidates])]
+
+            return [(self._ids[row], float(scores[row])) for row in order]
+
+    async def asearch(
+        self,
+        query: List[float],
+        threshold: float,
+        limit: int
+    ) -> List[Tuple[str, float]]:
+        """search() in a worker thread, so the scan does not block the event loop"""
+        return await asyncio.to_thread(self.search, query, threshold, limit)
+
+    def stats(self) -> dict:
+        """Index size for monitoring"""
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "rows": len(self._ids),
+                "capacity": self._matrix.shape[0],
+                "memory_bytes": self._matrix.nbytes
+            }
+
+    def _grow(self) -> None:
+        grown = np.zeros((self._matrix.shape[0] * 2, self.dimensions), dtype=np.float32)
+        grown[:self._matrix.shape[0]] = self._matrix
+        self._matrix = grown
+
+    # ==================== Database sync ====================
+
+    async def aload(self, db) -> None:
+        """
+        Load every suggestion embedding from the database
+
+        Args:
+            db: Async database session
+        """
+        rows, latest = await self._fetch_all(db)
+        self.load(rows)
+        self.synced_until = latest
+        logger.info("Vector index loaded with %d suggestions", len(self))
+
+    async def _fetch_all(self, db) -> Tuple[list, Optional[datetime]]:
+        """Every (suggestion id, embedding) pair, and the newest created_at"""
+        from database.models import Suggestion
+
+        result = await db.stream(
+            select(Suggestion.id, Suggestion.embedding, Suggestion.created_at)
+            .execution_options(yield_per=1000)
+        )
+
+        rows = []
+        latest = None
+        async for suggestion_id, embedding, created_at in result:
+            rows.append((suggestion_id, embedding))
+            if created_at is not None and (latest is None or created_at > latest):
+                latest = created_at
+        return rows, latest
+
+    async def sync_new_rows(self, db) -> int:
+        """
+        Pick up suggestions created since the last sync (e.g. by other workers)
+
+        created_at is the start time of the inserting transaction, so a row
+        from a long transaction (such as a bulk import) can commit after the
+        watermark has passed it; reconcile() picks such rows up.
+
+        Args:
+            db: Async database session
+
+        Returns:
+            Number of rows added or replaced
+        """
+        from database.models import Suggestion
+
+        query = select(Suggestion.id, Suggestion.embedding, Suggestion.created_at).where(
+            Suggestion.embedding.isnot(None)
+        )
+        if self.synced_until is not None:
+            # >= so rows sharing the last timestamp are not missed; add() is idempotent
+            query = query.where(Suggestion.created_at >= self.synced_until)
+
+        result = await db.execute(query)
+        rows = []
+        latest = self.synced_until
+        for suggestion_id, embedding, created_at in result:
+            rows.append((suggestion_id, embedding))
+            if created_at is not None and (latest is None or created_at > latest):
+                latest = created_at
+
+        added = await self.aadd_many(rows)
+        self.synced_until = latest
+        return added
+
+    async def reconcile(self, db) -> Tuple[int, int]:
+        """
+        Make the index match the table: add missing rows, drop deleted ones
+
+        Only ids are compared; embeddings are fetched for missing rows only.
+
+        Args:
+            db: Async database session
+
+        Returns:
+            (rows added, rows removed)
+        """
+        from database.models import Suggestion
+
+        # Snapshot first: rows indexed after it were committed after it and
+        # may be missing from the query result, so they must not be dropped
+        indexed = self.ids()
+        result = await db.execute(select(Suggestion.id).where(Suggestion.embedding.isnot(None)))
+        current = {str(suggestion_id) for suggestion_id in result.scalars()}
+
+        missing = [uuid.UUID(key) for key in current - indexed]
+        for start in range(0, len(missing), RECONCILE_FETCH_ROWS):
+            result = await db.execute(
+                select(Suggestion.id, Suggestion.embedding)
+                .where(Suggestion.id.in_(missing[start:start + RECONCILE_FETCH_ROWS]))
+            )
+            await self.aadd_many(
+                (suggestion_id, embedding) for suggestion_id, embedding in result if embedding is not None
+            )
+
+        stale = indexed - current
+        await self.aremove_many(stale)
+
+        if missing or stale:
+            logger.info("%s reconciled: %d added, %d removed", type(self).__name__, len(missing), len(stale))
+        return len(missing), len(stale)
+
+
+def _normalize(embedding) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+# Global index instance (used when VECTOR_SEARCH_BACKEND = "memory")
+vector_index = VectorIndex()
+
+
+async def sync_index_forever(index, interval_seconds: float, reconcile_seconds: float) -> None:
+    """
+    Background task: periodically pull rows inserted by other workers, and
+    fully reconcile with the table every reconcile_seconds (late commits,
+    deleted suggestions)
+
+    Args:
+        index: Any in-process index with async sync_new_rows(db) and reconcile(db) methods
+        interval_seconds: Delay between syncs
+        reconcile_seconds: Delay between full reconciles
+    """
+    from database.connection import AsyncSessionLocal
+
+    last_reconcile = time.monotonic()
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with AsyncSessionLocal() as db:
+                if time.monotonic() - last_reconcile >= reconcile_seconds:
+                    await index.reconcile(db)
+                    last_reconcile = time.monotonic()
+                else:
+                    await index.sync_new_rows(db)
+        except Exception as e:
+            logger.warning("%s sync failed: %s", type(index).__name__, e)
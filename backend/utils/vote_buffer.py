@@ -0,0 +1,242 @@
+"""
+Vote Counter Buffer
+Write-behind aggregation of suggestions.vote_count deltas for hot suggestions
+"""
+import asyncio
+import logging
+import uuid
+from typing import Dict
+
+from sqlalchemy import text
+
+
+logger = logging.getLogger(__name__)
+
+# Apply many per-suggestion deltas in one statement
+FLUSH_DELTAS = text("""
+    UPDATE suggestions
+    SET vote_count = COALESCE(suggestions.vote_count, 0) + pending.delta
+    FROM (
+        SELECT unnest(CAST(:ids AS uuid[])) AS id,
+               unnest(CAST(:deltas AS integer[])) AS delta
+    ) AS pending
+    WHERE suggestions.id = pending.id
+""")
+
+# Suggestions whose vote_count differs from their number of vote rows
+FIND_VOTE_COUNT_DRIFT = text("""
+    SELECT suggestions.id, COALESCE(counted.votes, 0) - COALESCE(suggestions.vote_count, 0) AS drift
+    FROM suggestions
+    LEFT JOIN (
+        SELECT suggestion_id, count(*) AS votes FROM votes GROUP BY suggestion_id
+    ) AS counted ON counted.suggestion_id = suggestions.id
+    WHERE COALESCE(counted.votes, 0) <> COALESCE(suggestions.vote_count, 0)
+""")
+
+# Add the confirmed drift, re-checked under the row lock so a row another
+# worker has fixed (or flushed into) in the meantime is left alone
+FIX_VOTE_COUNT_DRIFT = text("""
+    UPDATE suggestions
+    SET vote_count = COALESCE(suggestions.vote_count, 0) + drifted.drift
+    FROM (
+        SELECT unnest(CAST(:ids AS uuid[])) AS id,
+               unnest(CAST(:drifts AS integer[])) AS drift
+    ) AS drifted
+    WHERE suggestions.id = drifted.id
+      AND (SELECT count(*) FROM votes WHERE votes.suggestion_id = suggestions.id)
+          - COALESCE(suggestions.vote_count, 0) = drifted.drift
+""")
+
+
+class VoteCounterBuffer:
+    """
+    Buffers vote_count deltas in memory and flushes them in batches
+
+    Vote rows are written immediately by the request; only the counter
+    update is deferred, so the votes table stays authoritative. Hundreds of
+    votes on one suggestion become a single UPDATE per flush interval.
+    Readers call overlay() to add deltas not yet flushed by this worker.
+    Deltas of a flush in progress are overlaid until its UPDATE has run;
+    during the commit round trip a reader may briefly see the old count
+    without them, but never both the new count and the deltas.
+
+    Buffers are per worker: a worker only overlays its own deltas, so
+    readers served by another worker see them after the flush. Deltas still
+    buffered when a worker is killed are lost; reconcile() repairs the
+    counters from the votes table afterwards.
+
+    All methods run on the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self):
+        self._pending: Dict[uuid.UUID, int] = {}
+        self._flushing: Dict[uuid.UUID, int] = {}
+        self._suspected_drift: Dict[uuid.UUID, int] = {}
+
+        # Counters
+        self.recorded = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.rows_reconciled = 0
+
+    def record(self, suggestion_id: uuid.UUID, delta: int) -> None:
+        """Queue a vote_count change for the next flush"""
+        if delta:
+            self._pending[suggestion_id] = self._pending.get(suggestion_id, 0) + delta
+            self.recorded += 1
+
+    def pending_delta(self, suggestion_id) -> int:
+        """Delta not yet visible in the database (including a flush whose UPDATE has not run)"""
+        if not self._pending and not self._flushing:
+            return 0
+        if not isinstance(suggestion_id, uuid.UUID):
+            suggestion_id = uuid.UUID(str(suggestion_id))
+        return self._pending.get(suggestion_id, 0) + self._flushing.get(suggestion_id, 0)
+
+    def overlay(self, suggestion_id, vote_count) -> int:
+        """Stored vote_count plus this worker's unflushed delta"""
+        return (vote_count or 0) + self.pending_delta(suggestion_id)
+
+    async def flush(self, db) -> int:
+        """
+        Write pending deltas to the database in one UPDATE
+
+        Args:
+            db: Async database session
+
+        Returns:
+            Number of suggestions updated
+        """
+        if not self._pending:
+            return 0
+
+        flushing, self._pending = self._pending, {}
+        self._flushing = flushing
+        ids = list(flushing)
+        try:
+            await db.execute(
+                FLUSH_DELTAS,
+                {"ids": ids, "deltas": [flushing[i] for i in ids]}
+            )
+            # The deltas are now part of vote_count: stop overlaying them
+            # before the commit, so a reader that already sees the committed
+            # count never adds them a second time
+            self._flushing = {}
+            await db.commit()
+        except Exception:
+            self._flushing = {}
+            await db.rollback()
+            # Put the deltas back so the next flush retries them
+            for suggestion_id, delta in flushing.items():
+                self._pending[suggestion_id] = self._pending.get(suggestion_id, 0) + delta
+            raise
+
+        self.flushes += 1
+        self.rows_flushed += len(ids)
+        return len(ids)
+
+    async def reconcile(self, db) -> int:
+        """
+        Repair vote_count values that no longer match the votes table
+
+        Deltas buffered by any worker make vote_count lag the votes table
+        for up to one flush interval, so a drift is only repaired once the
+        same drift has been seen by two consecutive calls (and this worker
+        has nothing buffered for the suggestion). Call it at intervals much
+        longer than the flush interval.
+
+        Args:
+            db: Async database session
+
+        Returns:
+            Number of suggestions repaired
+        """
+        result = await db.execute(FIND_VOTE_COUNT_DRIFT)
+        drift = {suggestion_id: int(delta) for suggestion_id, delta in result}
+
+        confirmed = {
+            suggestion_id: delta for suggestion_id, delta in drift.items()
+            if self._suspected_drift.get(suggestion_id) == delta and not self.pending_delta(suggestion_id)
+        }
+        self._suspected_drift = {
+            suggestion_id: delta for suggestion_id, delta in drift.items() if suggestion_id not in confirmed
+        }
+        if not confirmed:
+            return 0
+
+        ids = list(confirmed)
+        try:
+            result = await db.execute(
+                FIX_VOTE_COUNT_DRIFT,
+                {"ids": ids, "drifts": [confirmed[i] for i in ids]}
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+        repaired = result.rowcount
+        self.rows_reconciled += repaired
+        if repaired:
+            logger.info("Vote counts reconciled for %d suggestions", repaired)
+        return repaired
+
+    def stats(self) -> dict:
+        """Buffer counters for monitoring"""
+        return {
+            "pending_suggestions": len(self._pending),
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "rows_reconciled": self.rows_reconciled
+        }
+
+
+# Global buffer instance (used when VOTE_WRITE_BEHIND_ENABLED = True)
+vote_counter_buffer = VoteCounterBuffer()
+
+
+async def flush_vote_counts() -> None:
+    """
+    Flush the buffer once in its own session
+
+    Errors are logged and the deltas kept for the next attempt.
+    """
+    from database.connection import AsyncSessionLocal
+
+    try:
+        async with AsyncSessionLocal() as db:
+            await vote_counter_buffer.flush(db)
+    except Exception as e:
+        logger.warning("Vote count flush failed: %s", e)
+
+
+async def flush_vote_counts_forever(interval_ms: int) -> None:
+    """
+    Background task: flush buffered vote_count deltas every interval_ms
+
+    Args:
+        interval_ms: Delay between flushes
+    """
+    while True:
+        await asyncio.sleep(interval_ms / 1000)
+        await flush_vote_counts()
+
+
+async def reconcile_vote_counts_forever(interval_seconds: float) -> None:
+    """
+    Background task: repair drifted vote_count values (e.g. deltas lost
+    when a worker was killed), starting at startup
+
+    Args:
+        interval_seconds: Delay between reconcile passes
+    """
+    from database.connection import AsyncSessionLocal
+
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await vote_counter_buffer.reconcile(db)
+        except Exception as e:
+            logger.warning("Vote count reconcile failed: %s", e)
+        await asyncio.sleep(interval_seconds)
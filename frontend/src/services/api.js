@@ -137,9 +137,17 @@ export const suggestionsAPI = {
     return response.data;
   },
 
-  getMyVotes: async () => {
-    const response = await api.get('/suggestions/my/votes');
-    return response.data;
+  // Loads every page, following the X-Next-Cursor response header
+  getMyVotes: async (pageSize = 100) => {
+    const votes = [];
+    let cursor = null;
+    do {
+      const params = cursor ? { limit: pageSize, cursor } : { limit: pageSize };
+      const response = await api.get('/suggestions/my/votes', { params });
+      votes.push(...response.data);
+      cursor = response.headers['x-next-cursor'] || null;
+    } while (cursor);
+    return votes;
   },
 
   update: async (suggestionId, updates) => {